@@ -1,15 +1,22 @@
-from sentence_transformers import SentenceTransformer, util
 from swap import get_swap_invoice_summary
-from near import get_nearest_station
+from near import get_nearest_station, get_station_index
 from subs import get_subscription_details
 from leave import get_leave_and_activation_info
-from groq import Groq
-from prompts import SYSTEM_PROMPT, OPEN_TALK_PROMPT, REFINE_PROMPT
-from tts import speak_text
-from asr import start_listening_thread
+import llm_client
+from prompts import SYSTEM_PROMPT, OPEN_TALK_PROMPT
+from batcher import MicroBatcher
+from lru_cache import LRUCache
+from intent import KeywordRouter
+from sentiment import get_sentiment_backend
+from session_store import create_session_store
+from embedding_engine import create_embedding_engine
+from workers import run_cpu, MAX_ACTIVE_TURNS
 import os
+import re
 import threading
 import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -24,63 +31,191 @@ INTENT_EXAMPLES = {
     "end_chat": ["bye", "goodbye", "end", "close", "finish"]
 }
 
+def normalize_utterance(text):
+    # MiniLM is uncased, so case and spacing never change the embedding
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+# intent.py keyword labels -> classifier intent labels
+KEYWORD_INTENT_MAP = {
+    "swap": "swap_history",
+    "nearest_station": "nearest_station",
+    "subscription": "subscription_status",
+    "leave": "leave_info"
+}
+
 class IntentClassifier:
-    def __init__(self):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.embeddings = {intent: self.model.encode(examples) for intent, examples in INTENT_EXAMPLES.items()}
+    def __init__(self, cache_size=2048, cache_ttl=None):
+        self.intents = list(INTENT_EXAMPLES.keys())
+
+        # Repeated utterances skip the model entirely
+        self.embedding_cache = LRUCache(cache_size, cache_ttl)
+        self.result_cache = LRUCache(cache_size, cache_ttl)
+
+        # All examples stacked into one L2-normalized matrix; offsets mark
+        # where each intent's rows start, for a segment-max per intent
+        self.examples, self.offsets = [], []
+        for intent in self.intents:
+            self.offsets.append(len(self.examples))
+            self.examples.extend(INTENT_EXAMPLES[intent])
+        self.offsets = np.array(self.offsets)
+
+        # The model is loaded on first use (or by warm_up()), so importing
+        # this module stays cheap
+        self._model = None
+        self.example_matrix = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """Load MiniLM (EMBED_BACKEND) and embed the intent examples; runs once."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    model = create_embedding_engine()
+                    self.example_matrix = self._normalize(model.encode(self.examples))
+                    self._model = model
+        return self._model
+
+    @property
+    def model(self):
+        return self.load()
+
+    @staticmethod
+    def _normalize(emb):
+        emb = np.asarray(emb, dtype=np.float32)
+        norms = np.linalg.norm(emb, axis=-1, keepdims=True)
+        return emb / np.maximum(norms, 1e-12)
+
+    def embed(self, texts):
+        """Return L2-normalized embeddings, encoding only uncached utterances."""
+        keys = [normalize_utterance(t) for t in texts]
+        found = {}
+        for key in dict.fromkeys(keys):
+            emb = self.embedding_cache.get(key)
+            if emb is not None:
+                found[key] = emb
+
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        if missing:
+            # Off the request thread so green-thread servers keep serving
+            encoded = run_cpu(self.model.encode, missing)
+            for key, emb in zip(missing, self._normalize(encoded)):
+                self.embedding_cache.put(key, emb)
+                found[key] = emb
+
+        return np.stack([found[k] for k in keys])
 
     def classify(self, text):
-        query_emb = self.model.encode(text)
-        best_intent, best_score = None, 0
-        
-        for intent, emb in self.embeddings.items():
-            score = util.cos_sim(query_emb, emb).max().item()
-            if score > best_score:
-                best_intent, best_score = intent, score
-        
-        return {"intent": best_intent if best_score > 0.5 else "open_talk", "confidence": best_score}
+        return self.classify_batch([text])[0]
+
+    def classify_batch(self, texts):
+        if not texts:
+            return []
+
+        keys = [normalize_utterance(t) for t in texts]
+        results = {}
+        for key in dict.fromkeys(keys):
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                results[key] = cached
+
+        missing = [k for k in dict.fromkeys(keys) if k not in results]
+        if missing:
+            # One forward pass, one matmul, then the best example per intent
+            scores = self.embed(missing) @ self.example_matrix.T
+            intent_scores = np.maximum.reduceat(scores, self.offsets, axis=1)
+
+            for key, row in zip(missing, intent_scores):
+                idx = int(row.argmax())
+                best_score = max(float(row[idx]), 0)
+                result = {
+                    "intent": self.intents[idx] if best_score > 0.5 else "open_talk",
+                    "confidence": best_score
+                }
+                self.result_cache.put(key, result)
+                results[key] = result
+
+        # Copies so callers can't mutate cached entries
+        return [dict(results[k]) for k in keys]
+
+    def cache_stats(self):
+        return {
+            "embeddings": self.embedding_cache.stats(),
+            "results": self.result_cache.stats()
+        }
 
 # Global classifier instance
-classifier = IntentClassifier()
+classifier = IntentClassifier(
+    cache_size=int(os.getenv("INTENT_CACHE_SIZE", "2048")),
+    cache_ttl=float(os.getenv("INTENT_CACHE_TTL", "0")) or None
+)
+
+# Concurrent requests share one batched encode instead of each running its own
+intent_batcher = MicroBatcher(
+    classifier.classify_batch,
+    max_batch=int(os.getenv("INTENT_BATCH_MAX_SIZE", "16")),
+    max_wait_ms=float(os.getenv("INTENT_BATCH_MAX_WAIT_MS", "5"))
+)
+
+# Clear keyword hits are answered before the transformer runs
+keyword_router = KeywordRouter()
+
+def classify_intent(query):
+    keyword_intent, confidence = keyword_router.route(query)
+    if keyword_intent is not None:
+        return {"intent": KEYWORD_INTENT_MAP[keyword_intent], "confidence": confidence}
+    return intent_batcher(query)
 
 class ConversationMemory:
-    def __init__(self):
-        self.sessions = {}
-        self.sentiment_scores = {}
+    """
+    Recent chat turns and sentiment scores per session, kept in a bounded
+    session store (SESSION_BACKEND) so idle drivers are evicted and worker
+    processes can share conversations.
+    """
+    def __init__(self, store=None, max_messages=10, max_scores=5):
+        self.store = store or create_session_store()
+        self.max_messages = max_messages
+        self.max_scores = max_scores
     
     def add_message(self, session_id, role, content):
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
-        self.sessions[session_id].append({"role": role, "content": content})
-        if len(self.sessions[session_id]) > 10:
-            self.sessions[session_id] = self.sessions[session_id][-10:]
+        self.store.append(session_id, "messages", {"role": role, "content": content}, self.max_messages)
     
     def get_context(self, session_id):
-        return self.sessions.get(session_id, [])
+        return self.store.items(session_id, "messages")
     
     def update_sentiment(self, session_id, score):
-        if session_id not in self.sentiment_scores:
-            self.sentiment_scores[session_id] = []
-        self.sentiment_scores[session_id].append(score)
-        if len(self.sentiment_scores[session_id]) > 5:
-            self.sentiment_scores[session_id] = self.sentiment_scores[session_id][-5:]
+        self.store.append(session_id, "scores", score, self.max_scores)
     
     def get_avg_sentiment(self, session_id):
-        scores = self.sentiment_scores.get(session_id, [0])
+        scores = self.store.items(session_id, "scores") or [0]
         return sum(scores) / len(scores)
 
 memory = ConversationMemory()
 
+# Local by default; set SENTIMENT_BACKEND=groq to use the LLM
+sentiment_backend = get_sentiment_backend(classifier=classifier)
+
+def warm_up():
+    """
+    Load the intent model, the sentiment backend, the driver data and the
+    LLM client now instead of on the first query. Servers call this at boot.
+    """
+    start = time.perf_counter()
+    classifier.load()
+    get_station_index()
+    if hasattr(sentiment_backend, "load"):
+        sentiment_backend.load()
+    try:
+        llm_client.get_client()
+    except Exception as e:
+        print(f"[Warm-up] LLM client not ready: {e}")
+    print(f"[Warm-up] models, data and clients ready in {(time.perf_counter() - start) * 1000:.0f}ms")
+
 def analyze_sentiment(text):
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    response = client.chat.completions.create(
-        messages=[{"role": "user", "content": f"Rate sentiment of: '{text}' on scale -1 (negative) to 1 (positive). Reply only with number."}],
-        model="llama-3.3-70b-versatile",
-        max_tokens=5
-    )
     try:
-        return float(response.choices[0].message.content.strip())
-    except:
+        return sentiment_backend.score(text)
+    except Exception as e:
+        print(f"[Sentiment Error: {e}]")
         return 0
 
 def generate_handoff_summary(session_id, driver_id):
@@ -90,9 +225,7 @@ def generate_handoff_summary(session_id, driver_id):
         summary += f"{msg['role']}: {msg['content'][:50]}... "
     return summary
 
-def refine_with_groq(text, is_open_talk=False, original_query="", session_id="default"):
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    
+def build_refine_messages(text, is_open_talk=False, original_query="", session_id="default"):
     messages = [{"role": "system", "content": SYSTEM_PROMPT}]
     messages.extend(memory.get_context(session_id))
     
@@ -102,58 +235,168 @@ def refine_with_groq(text, is_open_talk=False, original_query="", session_id="de
         prompt = f"User asked: {original_query}\n\nData: {text}\n\nMake this conversational in 1-2 lines with Hindi-English mix."
     
     messages.append({"role": "user", "content": prompt})
-    
-    response = client.chat.completions.create(
-        messages=messages,
-        model="llama-3.3-70b-versatile",
-        max_tokens=50
-    )
-    
-    bot_response = response.choices[0].message.content
+    return messages
+
+def refine_with_groq(text, is_open_talk=False, original_query="", session_id="default"):
+    messages = build_refine_messages(text, is_open_talk, original_query, session_id)
+    bot_response = llm_client.complete(messages, max_tokens=50)
     memory.add_message(session_id, "user", original_query)
     memory.add_message(session_id, "assistant", bot_response)
     
     return bot_response
 
-def process_query(driver_id, query, session_id="default"):
-    # Analyze sentiment
-    sentiment = analyze_sentiment(query)
-    memory.update_sentiment(session_id, sentiment)
-    avg_sentiment = memory.get_avg_sentiment(session_id)
+# Fixed replies that skip the LLM
+HANDOFF_RESPONSE = "Aapko human agent se connect kar raha hun. Please wait..."
+END_CHAT_RESPONSE = "Dhanyawad! Aapka din shubh ho. Goodbye!"
+FALLBACK_RESPONSE_DATA = "Sorry, I didn't understand. I can help with swap history, nearest stations, subscription status, or leave info."
+
+# Resolver for each data intent; the lookup can start as soon as intent is known
+INTENT_RESOLVERS = {
+    "swap_history": get_swap_invoice_summary,
+    "nearest_station": get_nearest_station,
+    "subscription_status": get_subscription_details,
+    "leave_info": get_leave_and_activation_info
+}
+
+# Shared pool for the stages offloaded from the request thread: sentiment
+# and lookup, so up to two tasks for each admitted turn
+pipeline_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PIPELINE_WORKERS", str(2 * MAX_ACTIVE_TURNS))),
+    thread_name_prefix="pipeline"
+)
+
+class PipelineStats:
+    """Running per-stage timings (ms) for process_query."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.totals = {}
+        self.last = {}
+
+    def record(self, timings):
+        with self._lock:
+            self.count += 1
+            self.last = dict(timings)
+            for stage, ms in timings.items():
+                self.totals[stage] = self.totals.get(stage, 0.0) + ms
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queries": self.count,
+                "avg_ms": {stage: total / self.count for stage, total in self.totals.items()},
+                "last_ms": dict(self.last)
+            }
+
+pipeline_stats = PipelineStats()
+
+def _timed(timings, stage, fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        timings[stage] = (time.perf_counter() - start) * 1000
+
+def _finish(timings, start):
+    # Snapshot: a cancelled lookup may still be writing its timing
+    timings = dict(timings)
+    timings["total"] = (time.perf_counter() - start) * 1000
+    pipeline_stats.record(timings)
+    print("[Timings] " + ", ".join(f"{stage}={ms:.1f}ms" for stage, ms in timings.items()))
+
+def _route_query(driver_id, query, session_id, timings):
+    """
+    Run intent, sentiment and lookup stages.
+    Returns (final_response, should_end, refine_kwargs); final_response is
+    None when the reply still has to be generated by the LLM.
+    """
+    # Intent runs on the calling thread, so every active turn can wait in
+    # the intent MicroBatcher at once; sentiment runs beside it. The
+    # embedding sentiment backend waits for intent so it can reuse the
+    # cached query embedding.
+    sentiment_future = None
+    if sentiment_backend.name != "embedding":
+        sentiment_future = pipeline_executor.submit(_timed, timings, "sentiment", analyze_sentiment, query)
     
-    result = classifier.classify(query)
+    result = _timed(timings, "intent", classify_intent, query)
     intent = result["intent"]
     
+    # Speculatively start the data lookup; it is dropped on handoff
+    lookup_future = None
+    if intent in INTENT_RESOLVERS:
+        lookup_future = pipeline_executor.submit(_timed, timings, "lookup", INTENT_RESOLVERS[intent], driver_id)
+    
+    if sentiment_future is None:
+        sentiment = _timed(timings, "sentiment", analyze_sentiment, query)
+    else:
+        sentiment = sentiment_future.result()
+    memory.update_sentiment(session_id, sentiment)
+    avg_sentiment = memory.get_avg_sentiment(session_id)
+    
     # Check handoff conditions
     if intent == "handoff" or avg_sentiment < -0.6:
+        if lookup_future is not None:
+            lookup_future.cancel()
         summary = generate_handoff_summary(session_id, driver_id)
         print("\n" + summary)
-        return "Aapko human agent se connect kar raha hun. Please wait...", True
+        return HANDOFF_RESPONSE, True, None
     
     # Check end chat
     if intent == "end_chat":
-        return "Dhanyawad! Aapka din shubh ho. Goodbye!", True
+        return END_CHAT_RESPONSE, True, None
     
     if intent == "open_talk":
-        response = refine_with_groq("", is_open_talk=True, original_query=query, session_id=session_id)
-    elif intent == "swap_history":
-        raw_response = get_swap_invoice_summary(driver_id)
-        response = refine_with_groq(raw_response, original_query=query, session_id=session_id)
-    elif intent == "nearest_station":
-        raw_response = get_nearest_station(driver_id)
-        response = refine_with_groq(raw_response, original_query=query, session_id=session_id)
-    elif intent == "subscription_status":
-        raw_response = get_subscription_details(driver_id)
-        response = refine_with_groq(raw_response, original_query=query, session_id=session_id)
-    elif intent == "leave_info":
-        raw_response = get_leave_and_activation_info(driver_id)
-        response = refine_with_groq(raw_response, original_query=query, session_id=session_id)
-    else:
-        response = refine_with_groq("Sorry, I didn't understand. I can help with swap history, nearest stations, subscription status, or leave info.", original_query=query, session_id=session_id)
+        return None, False, {"text": "", "is_open_talk": True}
+    if lookup_future is not None:
+        return None, False, {"text": lookup_future.result()}
+    return None, False, {"text": FALLBACK_RESPONSE_DATA}
+
+def process_query(driver_id, query, session_id="default"):
+    timings = {}
+    start = time.perf_counter()
+    
+    response, should_end, refine = _route_query(driver_id, query, session_id, timings)
+    if response is None:
+        response = _timed(timings, "refine", refine_with_groq, original_query=query, session_id=session_id, **refine)
+    
+    _finish(timings, start)
+    return response, should_end
+
+def process_query_stream(driver_id, query, session_id="default"):
+    """
+    Same as process_query, but returns (token_iterator, should_end) so the
+    LLM reply can be spoken while it is still being generated.
+    """
+    timings = {}
+    start = time.perf_counter()
     
-    return response, False
+    response, should_end, refine = _route_query(driver_id, query, session_id, timings)
+    if response is not None:
+        _finish(timings, start)
+        return iter([response]), should_end
+    
+    def tokens():
+        refine_start = time.perf_counter()
+        parts = []
+        messages = build_refine_messages(original_query=query, session_id=session_id, **refine)
+        for token in llm_client.stream_complete(messages, max_tokens=50):
+            if not parts:
+                timings["first_token"] = (time.perf_counter() - refine_start) * 1000
+            parts.append(token)
+            yield token
+        timings["refine"] = (time.perf_counter() - refine_start) * 1000
+        
+        memory.add_message(session_id, "user", query)
+        memory.add_message(session_id, "assistant", "".join(parts))
+        _finish(timings, start)
+    
+    return tokens(), False
 
 if __name__ == "__main__":
+    from tts import speak_text
+    from asr import start_listening_thread
+
     driver_id = input("Driver ID: ")
     session_id = driver_id
     
@@ -1,9 +1,10 @@
 import speech_recognition as sr
+from asr_engine import get_asr_engine
 import threading
-import time
 
 def continuous_transcription(callback=None, interrupt_event=None):
     recognizer = sr.Recognizer()
+    engine = get_asr_engine()
     
     # Adjust for balanced response
     recognizer.pause_threshold = 1.0
@@ -27,7 +28,7 @@ def continuous_transcription(callback=None, interrupt_event=None):
                 audio = recognizer.listen(source, timeout=2, phrase_time_limit=8)
                 
                 print("Processing...")
-                text = recognizer.recognize_google(audio).lower()
+                text = engine.transcribe_audio(audio).lower()
                 
                 print(f"You said: {text}")
                 
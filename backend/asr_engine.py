@@ -0,0 +1,199 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import namedtuple
+import speech_recognition as sr
+from dotenv import load_dotenv
+load_dotenv()
+
+# One recognition hypothesis; partials may still change, finals will not
+Transcript = namedtuple("Transcript", ["text", "is_final"])
+
+
+class ASRStream(ABC):
+    """
+    Incremental recognition session. Feed 16-bit mono PCM with accept(),
+    which may return a partial Transcript; finish() returns the final one.
+    Raises sr.UnknownValueError when no speech was recognized, like
+    Recognizer.recognize_google, so callers keep their existing handling.
+    """
+
+    @abstractmethod
+    def accept(self, pcm):
+        ...
+
+    @abstractmethod
+    def finish(self):
+        ...
+
+
+class ASREngine(ABC):
+    """Base speech-to-text engine."""
+
+    name = None
+    # Local decoders are CPU-bound and belong on a worker pool thread;
+    # network engines are left on the (possibly green) request thread
+    cpu_bound = False
+
+    @abstractmethod
+    def create_stream(self, sample_rate, sample_width=2):
+        ...
+
+    def transcribe(self, pcm, sample_rate, sample_width=2):
+        """Recognize a complete utterance of raw PCM and return its text."""
+        stream = self.create_stream(sample_rate, sample_width)
+        stream.accept(pcm)
+        return stream.finish().text
+
+    def transcribe_audio(self, audio):
+        """Recognize an sr.AudioData (e.g. from Recognizer.record/listen)."""
+        return self.transcribe(audio.get_raw_data(), audio.sample_rate, audio.sample_width)
+
+
+class _GoogleStream(ASRStream):
+    def __init__(self, recognizer, sample_rate, sample_width):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frames = []
+
+    def accept(self, pcm):
+        # Google's free endpoint only takes whole utterances: no partials
+        self.frames.append(bytes(pcm))
+        return None
+
+    def finish(self):
+        audio = sr.AudioData(b"".join(self.frames), self.sample_rate, self.sample_width)
+        self.frames = []
+        return Transcript(self.recognizer.recognize_google(audio), True)
+
+
+class GoogleASREngine(ASREngine):
+    """Google Web Speech API through speech_recognition (network)."""
+
+    name = "google"
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def create_stream(self, sample_rate, sample_width=2):
+        return _GoogleStream(self.recognizer, sample_rate, sample_width)
+
+    def transcribe_audio(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+
+class _VoskStream(ASRStream):
+    def __init__(self, model, sample_rate):
+        from vosk import KaldiRecognizer
+        self.recognizer = KaldiRecognizer(model, sample_rate)
+        self.segments = []
+
+    def accept(self, pcm):
+        if self.recognizer.AcceptWaveform(bytes(pcm)):
+            # Vosk closed a segment at a pause; keep it and keep going
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.segments.append(text)
+            return Transcript(" ".join(self.segments), False)
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return Transcript(" ".join(self.segments + [partial]).strip(), False)
+
+    def finish(self):
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        if text:
+            self.segments.append(text)
+        final = " ".join(self.segments).strip()
+        self.segments = []
+        if not final:
+            raise sr.UnknownValueError()
+        return Transcript(final, True)
+
+
+class VoskASREngine(ASREngine):
+    """
+    Offline CPU recognition with a Vosk (Kaldi) model. Frames are decoded
+    as they arrive, so recognition overlaps with speech.
+    """
+
+    name = "vosk"
+    cpu_bound = True
+
+    def __init__(self, model_path=None):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        model_path = model_path or os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-hi-0.22")
+        self.model = Model(model_path)
+
+    def create_stream(self, sample_rate, sample_width=2):
+        if sample_width != 2:
+            raise ValueError("Vosk expects 16-bit PCM")
+        return _VoskStream(self.model, sample_rate)
+
+
+class _StaticStream(ASRStream):
+    def __init__(self, engine):
+        self.engine = engine
+        self.samples = 0
+
+    def accept(self, pcm):
+        self.samples += len(pcm)
+        return None
+
+    def finish(self):
+        if self.engine.latency_ms:
+            time.sleep(self.engine.latency_ms / 1000)
+        if not self.samples:
+            raise sr.UnknownValueError()
+        self.samples = 0
+        return Transcript(self.engine.text, True)
+
+
+class StaticASREngine(ASREngine):
+    """
+    Offline backend for load tests: every non-empty utterance is heard as
+    the same text after latency_ms, like a remote recognizer would be.
+    """
+
+    name = "static"
+
+    def __init__(self, text="swap history", latency_ms=0):
+        self.text = text
+        self.latency_ms = latency_ms
+
+    def create_stream(self, sample_rate, sample_width=2):
+        return _StaticStream(self)
+
+
+def create_asr_engine(backend=None):
+    """
+    Build the engine named by `backend` or ASR_BACKEND
+    ("google" by default, "vosk", or "static" for load tests).
+    """
+    backend = (backend or os.getenv("ASR_BACKEND", "google")).lower()
+    if backend == "google":
+        return GoogleASREngine()
+    if backend == "vosk":
+        return VoskASREngine()
+    if backend == "static":
+        return StaticASREngine(
+            text=os.getenv("ASR_STATIC_TEXT", "swap history"),
+            latency_ms=float(os.getenv("ASR_STATIC_LATENCY_MS", "0"))
+        )
+    raise ValueError(f"Unknown ASR backend: {backend}")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_asr_engine():
+    """Process-wide ASR engine; the local model is loaded only once."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_asr_engine()
+    return _engine
@@ -0,0 +1,212 @@
+"""
+In-memory audio ingest for the voice paths: decode uploaded or streamed
+audio (WAV, or WebM/Ogg/MP3 from the browser) straight from bytes, downmix
+to mono and resample to the rate the recognizer works at. Nothing touches
+the disk.
+"""
+import io
+import os
+import wave
+from math import gcd
+import numpy as np
+import speech_recognition as sr
+from dotenv import load_dotenv
+load_dotenv()
+
+ASR_SAMPLE_RATE = int(os.getenv("ASR_SAMPLE_RATE", "16000"))
+
+# Leading bytes of the containers browsers and clients send us
+_MAGIC = (
+    (b"RIFF", "wav"),
+    (b"\x1aE\xdf\xa3", "webm"),
+    (b"OggS", "ogg"),
+    (b"fLaC", "flac"),
+    (b"ID3", "mp3"),
+    (b"\xff\xfb", "mp3"),
+    (b"\xff\xf3", "mp3"),
+)
+
+
+def sniff_format(data):
+    """Container format from the leading bytes, or None if unknown."""
+    for magic, fmt in _MAGIC:
+        if data.startswith(magic):
+            return fmt
+    return None
+
+
+def _to_int16(raw, sample_width):
+    if sample_width == 2:
+        return np.frombuffer(raw, dtype="<i2")
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        return ((np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8)
+    if sample_width == 3:
+        # Keep the top two bytes of each little-endian 24-bit sample
+        return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)[:, 1:].copy().view("<i2").ravel()
+    if sample_width == 4:
+        return (np.frombuffer(raw, dtype="<i4") >> 16).astype(np.int16)
+    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+
+def decode_wav(data):
+    """Decode WAV bytes to (int16 samples shaped (frames, channels), rate)."""
+    with wave.open(io.BytesIO(data), "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        rate = wav_file.getframerate()
+        raw = wav_file.readframes(wav_file.getnframes())
+        samples = _to_int16(raw, wav_file.getsampwidth())
+    return samples.reshape(-1, channels), rate
+
+
+def decode_compressed(data, fmt=None):
+    """
+    Decode WebM/Ogg/MP3/FLAC bytes with pydub. The data is piped through
+    ffmpeg's stdin/stdout, so no temporary files are written.
+    """
+    from pydub import AudioSegment
+    segment = AudioSegment.from_file(io.BytesIO(data), format=fmt)
+    samples = _to_int16(segment.raw_data, segment.sample_width)
+    return samples.reshape(-1, segment.channels), segment.frame_rate
+
+
+def to_mono(samples):
+    if samples.ndim == 1 or samples.shape[1] == 1:
+        return samples.reshape(-1)
+    return samples.mean(axis=1).astype(np.int16)
+
+
+class Resampler:
+    """
+    Streaming polyphase resampler for int16 PCM with downmix to mono.
+
+    The rate change up/down is done with one Kaiser-windowed sinc low-pass
+    split into `up` phases, so each output sample is a single dot product
+    over the input; all outputs of a chunk are computed at once. The filter
+    tail is carried between process() calls, so audio can be fed frame by
+    frame (e.g. 10 ms LiveKit frames) without clicks at the boundaries.
+    """
+
+    def __init__(self, rate, target_rate, channels=1, half_len=10, beta=5.0, block=8192):
+        g = gcd(rate, target_rate)
+        self.rate = rate
+        self.target_rate = target_rate
+        self.channels = channels
+        self.up = target_rate // g
+        self.down = rate // g
+        self.block = block
+
+        # Low-pass at the lower Nyquist, designed at the upsampled rate
+        max_rate = max(self.up, self.down)
+        n = 2 * half_len * max_rate + 1
+        t = np.arange(n) - (n - 1) / 2
+        h = np.sinc(t / max_rate) / max_rate * np.kaiser(n, beta) * self.up
+        self.taps = -(-n // self.up)
+        h = np.concatenate((h, np.zeros(self.taps * self.up - n)))
+        # phases[p, j] = h[p + j * up]; reversed so a row dots a forward slice
+        self.phases = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+        # Filter delay in output samples, trimmed by resample()
+        self.delay = (n - 1) // 2 // self.down
+
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.n_in = 0
+        self.n_out = 0
+
+    def process(self, pcm):
+        """Feed interleaved int16 PCM (bytes or array); return mono int16 output."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        if self.up == self.down:
+            return samples.astype(np.int16)
+
+        buf = np.concatenate((self.history, samples.astype(np.float32)))
+        buf_start = self.n_in - len(self.history)  # absolute index of buf[0]
+        self.n_in += len(samples)
+
+        # Output k uses inputs up to floor(k * down / up)
+        end = -(-self.n_in * self.up // self.down)
+        out = np.empty(max(end - self.n_out, 0), dtype=np.float32)
+        offsets = np.arange(self.taps)
+        for start in range(0, len(out), self.block):
+            ks = np.arange(self.n_out + start, min(self.n_out + start + self.block, end))
+            pos = ks * self.down
+            first = pos // self.up - buf_start - (self.taps - 1)
+            window = buf[first[:, None] + offsets]
+            out[start:start + len(ks)] = np.einsum("ij,ij->i", window, self.phases[pos % self.up])
+        self.n_out = end
+
+        self.history = buf[len(buf) - (self.taps - 1):] if self.taps > 1 else buf[:0]
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def flush(self):
+        """Push the filter tail through; call once at the end of a stream."""
+        if self.up == self.down:
+            return np.empty(0, dtype=np.int16)
+        return self.process(np.zeros(self.taps, dtype=np.int16))
+
+
+def resample(samples, rate, target_rate):
+    """Polyphase resample of a whole clip of mono int16 samples."""
+    if rate == target_rate or not len(samples):
+        return samples
+    resampler = Resampler(rate, target_rate)
+    out = np.concatenate((resampler.process(samples), resampler.flush()))
+    n = -(-len(samples) * resampler.up // resampler.down)
+    return out[resampler.delay:resampler.delay + n]
+
+
+def prepare_pcm(pcm, rate, channels=1, target_rate=ASR_SAMPLE_RATE):
+    """
+    Downmix and resample raw interleaved int16 PCM for recognition.
+    Returns (pcm_bytes, sample_rate).
+    """
+    # Byte view whether pcm is bytes or an int16 array, so the trim to
+    # whole frames counts bytes in both cases
+    data = memoryview(pcm).cast("B")
+    frame_bytes = 2 * channels
+    samples = np.frombuffer(data[:len(data) // frame_bytes * frame_bytes], dtype=np.int16)
+    samples = to_mono(samples.reshape(-1, channels))
+    return resample(samples, rate, target_rate).tobytes(), target_rate
+
+
+def encode_pcm(pcm, rate, fmt="pcm"):
+    """
+    Package mono int16 PCM for transport or storage: "pcm" (raw), "wav",
+    or "flac" (lossless, about half the size of PCM for speech; uses the
+    FLAC encoder bundled with speech_recognition).
+    """
+    if fmt == "pcm":
+        return bytes(pcm)
+    if fmt == "wav":
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(rate)
+            wav_file.writeframes(bytes(pcm))
+        return buf.getvalue()
+    if fmt == "flac":
+        return sr.AudioData(bytes(pcm), rate, 2).get_flac_data()
+    raise ValueError(f"Unknown audio encoding: {fmt}")
+
+
+def decode_audio(data, target_rate=ASR_SAMPLE_RATE):
+    """
+    Decode audio bytes to mono int16 PCM at target_rate.
+    Returns (pcm_bytes, sample_rate).
+    """
+    data = bytes(data)
+    fmt = sniff_format(data)
+    if fmt == "wav":
+        samples, rate = decode_wav(data)
+    else:
+        samples, rate = decode_compressed(data, fmt)
+    samples = resample(to_mono(samples), rate, target_rate or rate)
+    return samples.tobytes(), target_rate or rate
+
+
+def to_audio_data(data, target_rate=ASR_SAMPLE_RATE):
+    """Decode audio bytes into an sr.AudioData ready for recognition."""
+    pcm, rate = decode_audio(data, target_rate)
+    return sr.AudioData(pcm, rate, 2)
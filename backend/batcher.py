@@ -0,0 +1,94 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batched calls.
+
+    Requests are queued and a worker thread drains them into one call to
+    batch_fn(items) as soon as max_batch items are waiting or the oldest
+    one has waited max_wait_ms. Each caller gets a Future for its result.
+    """
+
+    def __init__(self, batch_fn, max_batch=16, max_wait_ms=5.0):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_batch_seen = 0
+        self._max_depth_seen = 0
+        # The drain thread starts with the first submit
+        self._pid = None
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so a pre-forked worker process
+        # starts its own drain thread too
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(target=self._run, args=(self._queue,), daemon=True)
+                self._worker.start()
+                self._pid = os.getpid()
+
+    def submit(self, item):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        depth = self._queue.qsize()
+        with self._lock:
+            self._max_depth_seen = max(self._max_depth_seen, depth)
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _run(self, requests):
+        while True:
+            pending = [requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(pending)
+
+    def _dispatch(self, pending):
+        items = [item for item, _ in pending]
+        try:
+            results = self.batch_fn(items)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        finally:
+            with self._lock:
+                self._batches += 1
+                self._items += len(items)
+                self._max_batch_seen = max(self._max_batch_seen, len(items))
+
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_depth_seen,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+                "max_batch_size": self._max_batch_seen,
+            }
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for live PCM buffering: the old list-of-samples buffer
+from livekit_agent vs PCMRingBuffer. Reports CPU time and allocations per
+second of 48 kHz mono audio delivered in 10 ms frames.
+The ring buffer allocates once up front; the list boxes every sample.
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+from ring_buffer import PCMRingBuffer
+
+RATE = 48000
+FRAME = RATE // 100     # 10 ms, as LiveKit delivers it
+WINDOW = RATE * 3       # the old 3 s recognition window
+
+
+def make_frames(seconds):
+    rng = np.random.default_rng(0)
+    audio = rng.integers(-3000, 3000, RATE * seconds, dtype=np.int16)
+    return [audio[i:i + FRAME].tobytes() for i in range(0, len(audio), FRAME)]
+
+
+def list_buffer(frames):
+    """The original approach: boxed samples in a list, rebuilt every window."""
+    audio_buffer = []
+    for frame in frames:
+        audio_buffer.extend(np.frombuffer(frame, dtype=np.int16))
+        if len(audio_buffer) >= WINDOW:
+            np.array(audio_buffer, dtype=np.int16).tobytes()
+            audio_buffer = []
+
+
+def ring_buffer(frames):
+    ring = PCMRingBuffer(WINDOW * 2)
+    for frame in frames:
+        ring.write(frame)
+        if len(ring) >= WINDOW:
+            ring.read(WINDOW)
+
+
+def measure(fn, frames, seconds):
+    start = time.process_time()
+    fn(frames)
+    cpu = time.process_time() - start
+
+    # Peak memory the buffering itself needs on top of the input frames
+    tracemalloc.start()
+    fn(frames)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu / seconds * 1000, peak / 1024
+
+
+def main(seconds=60):
+    frames = make_frames(seconds)
+
+    # Both buffers must hand the recognizer the same audio: the whole
+    # windows in (up to) the first two windows' worth of frames, in bytes
+    checked = frames[:min(len(frames), 2 * WINDOW // FRAME)]
+    pcm = b"".join(checked)
+    expected = pcm[:len(pcm) // (2 * WINDOW) * 2 * WINDOW]
+    ring = PCMRingBuffer(WINDOW)
+    got = b""
+    for frame in checked:
+        ring.write(frame)
+        if len(ring) >= WINDOW:
+            got += ring.read(WINDOW).tobytes()
+    assert got == expected
+
+    print(f"{seconds} s of {RATE} Hz mono in {FRAME}-sample frames")
+    print(f"{'':12s} {'cpu ms/audio-s':>15s} {'peak KiB':>10s}")
+    results = {}
+    for name, fn in (("list", list_buffer), ("ring", ring_buffer)):
+        results[name] = measure(fn, frames, seconds)
+        cpu, peak = results[name]
+        print(f"{name:12s} {cpu:15.3f} {peak:10.1f}")
+    print(f"cpu speedup: {results['list'][0] / results['ring'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
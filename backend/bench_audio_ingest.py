@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Payload size and latency of sending ASR 48 kHz audio vs the 16 kHz mono
+produced by the ingest resample/downmix stage.
+
+    python bench_audio_ingest.py [recording.wav] [runs]
+
+Without a recording, 5 s of synthetic 48 kHz stereo voice-band audio is
+used. ASR latency is measured with the engine selected by ASR_BACKEND
+and skipped if it is unavailable (no network, no model).
+"""
+import sys
+import time
+import numpy as np
+import speech_recognition as sr
+from asr_engine import get_asr_engine
+from audio_ingest import Resampler, decode_wav, encode_pcm, prepare_pcm, ASR_SAMPLE_RATE
+
+RATE = 48000
+
+
+def synthetic_call(seconds=5):
+    rng = np.random.default_rng(0)
+    t = np.arange(RATE * seconds) / RATE
+    # Harmonics of a wandering pitch, syllable envelope, some room noise
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None)
+    mono = voice * envelope * 6000 + rng.normal(0, 150, len(t))
+    return np.stack([mono, mono * 0.9], axis=1).astype(np.int16), RATE
+
+
+def size(label, data):
+    print(f"  {label:24s} {len(data) / 1024:9.1f} KiB")
+
+
+def encoded_size(label, pcm, rate):
+    try:
+        size(label, encode_pcm(pcm, rate, "flac"))
+    except Exception as e:
+        print(f"  {label:24s} skipped ({e})")
+
+
+def cpu_ms_per_audio_second(fn, seconds, runs=5):
+    start = time.process_time()
+    for _ in range(runs):
+        fn()
+    return (time.process_time() - start) / runs / seconds * 1000
+
+
+def asr_latency(pcm, rate, runs):
+    asr = get_asr_engine()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        try:
+            asr.transcribe(pcm, rate)
+        except sr.UnknownValueError:
+            pass
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main(path=None, runs=3):
+    if path:
+        with open(path, "rb") as f:
+            samples, rate = decode_wav(f.read())
+    else:
+        samples, rate = synthetic_call()
+    channels = samples.shape[1]
+    seconds = len(samples) / rate
+    raw = samples.tobytes()
+
+    native_mono, _ = prepare_pcm(raw, rate, channels, target_rate=rate)
+    asr_pcm, asr_rate = prepare_pcm(raw, rate, channels)
+
+    print(f"{seconds:.1f} s of {rate} Hz, {channels} channel(s)")
+    print("payload:")
+    size(f"{rate} Hz x{channels} PCM", raw)
+    size(f"{rate} Hz mono PCM", native_mono)
+    size(f"{asr_rate} Hz mono PCM", asr_pcm)
+    encoded_size(f"{rate} Hz mono FLAC", native_mono, rate)
+    encoded_size(f"{asr_rate} Hz mono FLAC", asr_pcm, asr_rate)
+
+    # Live path: 10 ms frames through the streaming resampler
+    frame = rate // 100 * channels * 2
+
+    def streamed():
+        resampler = Resampler(rate, ASR_SAMPLE_RATE, channels)
+        for i in range(0, len(raw), frame):
+            resampler.process(raw[i:i + frame])
+
+    print("resample + downmix cost:")
+    print(f"  {'whole clip':24s} {cpu_ms_per_audio_second(lambda: prepare_pcm(raw, rate, channels), seconds):9.2f} cpu ms/audio-s")
+    print(f"  {'10 ms frames':24s} {cpu_ms_per_audio_second(streamed, seconds):9.2f} cpu ms/audio-s")
+
+    print(f"ASR latency (median of {runs}):")
+    try:
+        slow = asr_latency(native_mono, rate, runs)
+        fast = asr_latency(asr_pcm, asr_rate, runs)
+    except Exception as e:
+        print(f"  skipped ({e})")
+        return
+    print(f"  {f'{rate} Hz mono':24s} {slow:9.1f} ms")
+    print(f"  {f'{asr_rate} Hz mono':24s} {fast:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None, *(int(a) for a in sys.argv[2:3]))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Embedding backend benchmark: p50/p99 single-utterance encode latency,
+batch throughput, load time and RSS for each EMBED_BACKEND, plus how
+closely each one matches the fp32 torch reference (min cosine and intent
+agreement on the bench queries).
+
+Each backend runs in its own process so RSS is not shared between them.
+Threads are pinned with EMBED_THREADS (default from embedding_engine).
+
+    python bench_embedding.py [--backends torch,torch-int8,onnx,onnx-int8] [--runs 300]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+QUERIES = [
+    "swap history", "mera battery swap kitna hua", "nearest station kahan hai",
+    "find station near me", "plan status batao", "subscription kab khatam hoga",
+    "leave policy kya hai", "hello", "good morning bhai", "agent se baat karao",
+    "bye", "mujhe invoice samajh nahi aaya", "closest dsk", "how are you",
+    "transfer to human", "vacation days kitne bache hain",
+]
+
+
+def rss_mib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def child(backend, runs, out_path):
+    """Measure one backend in this process and write the results to out_path."""
+    from embedding_engine import create_embedding_engine
+    from app import INTENT_EXAMPLES
+
+    base_rss = rss_mib()
+    start = time.perf_counter()
+    engine = create_embedding_engine(backend)
+    load_s = time.perf_counter() - start
+    engine.encode(QUERIES)  # first-call allocations are not latency
+
+    latencies = []
+    for i in range(runs):
+        text = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        engine.encode([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    batch = QUERIES * 2
+    start = time.perf_counter()
+    for _ in range(max(1, runs // 32)):
+        engine.encode(batch)
+    throughput = len(batch) * max(1, runs // 32) / (time.perf_counter() - start)
+
+    # Intent per query: best example over all intents, as IntentClassifier does
+    examples, labels = [], []
+    for intent, texts in INTENT_EXAMPLES.items():
+        examples.extend(texts)
+        labels.extend([intent] * len(texts))
+    query_emb = np.asarray(engine.encode(QUERIES), dtype=np.float32)
+    example_emb = np.asarray(engine.encode(examples), dtype=np.float32)
+    query_emb /= np.linalg.norm(query_emb, axis=1, keepdims=True)
+    example_emb /= np.linalg.norm(example_emb, axis=1, keepdims=True)
+    intents = [labels[i] for i in (query_emb @ example_emb.T).argmax(axis=1)]
+
+    with open(out_path, "w") as f:
+        json.dump({
+            # A backend out of tolerance is replaced by fp32 torch at load
+            "backend": backend if engine.name == backend else f"{backend}>{engine.name}",
+            "threads": engine.threads,
+            "load_s": load_s,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "per_s": throughput,
+            "rss_mib": rss_mib(),
+            "model_rss_mib": rss_mib() - base_rss,
+            "embeddings": query_emb.tolist(),
+            "intents": intents
+        }, f)
+
+
+def main(args):
+    from embedding_engine import min_cosine
+
+    results = []
+    for backend in args.backends.split(","):
+        with tempfile.NamedTemporaryFile(suffix=".json") as out:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", backend, "--runs", str(args.runs), "--out", out.name],
+                cwd=os.path.dirname(os.path.abspath(__file__))
+            )
+            if proc.returncode != 0:
+                print(f"{backend}: failed (exit {proc.returncode})")
+                continue
+            with open(out.name) as f:
+                results.append(json.load(f))
+
+    reference = next((r for r in results if r["backend"] == "torch"), results[0] if results else None)
+    print(f"\n{'backend':11s} {'thr':>3s} {'load s':>6s} {'p50 ms':>7s} {'p99 ms':>7s} {'batch/s':>8s} "
+          f"{'RSS MiB':>8s} {'model MiB':>9s} {'min cos':>8s} {'intents':>8s}")
+    for r in results:
+        agree = sum(a == b for a, b in zip(r["intents"], reference["intents"])) / len(QUERIES)
+        print(f"{r['backend']:11s} {r['threads']:3d} {r['load_s']:6.1f} {r['p50_ms']:7.2f} {r['p99_ms']:7.2f} "
+              f"{r['per_s']:8.0f} {r['rss_mib']:8.0f} {r['model_rss_mib']:9.0f} "
+              f"{min_cosine(reference['embeddings'], r['embeddings']):8.4f} {agree:8.0%}")
+    print(f"(min cos and intents vs {reference['backend']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backends", default="torch,torch-int8,onnx,onnx-int8")
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--child")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.runs, args.out)
+    else:
+        main(args)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+/text-chat payload size and latency: JSON with hex audio vs the streamed
+binary audio body (Accept: audio/*).
+
+Uses the local tone TTS backend with a first-byte delay and real-time
+pacing, so the numbers show what streaming saves without an ElevenLabs
+key. "bye" takes the fixed end-of-chat reply, so no LLM call is made.
+
+    python bench_http_audio.py [query] [runs]
+"""
+import sys
+import time
+import numpy as np
+import voice_server
+from tts_engine import LocalToneEngine
+
+JSON_ACCEPT = "application/json"
+AUDIO_ACCEPT = "audio/*, application/json;q=0.5"
+
+
+def request(client, query, accept):
+    start = time.perf_counter()
+    response = client.post("/text-chat", json={"query": query, "driver_id": "bench"},
+                           headers={"Accept": accept}, buffered=False)
+    first = None
+    size = 0
+    for chunk in response.response:
+        if chunk and first is None:
+            first = time.perf_counter()
+        size += len(chunk)
+    end = time.perf_counter()
+    response.close()
+    return {
+        "type": response.headers["Content-Type"],
+        "bytes": size,
+        "first_ms": (first - start) * 1000,
+        "total_ms": (end - start) * 1000
+    }
+
+
+def main(query="bye", runs=5):
+    # Uncached, paced TTS: ~first-byte delay of a hosted service
+    voice_server.tts = LocalToneEngine(latency_ms=200, realtime=True, chunk_ms=100)
+    client = voice_server.app.test_client()
+
+    print(f"query {query!r}, median of {runs}")
+    print(f"{'mode':8s} {'content-type':18s} {'bytes':>9s} {'first byte ms':>14s} {'total ms':>9s}")
+    results = {}
+    for mode, accept in (("json", JSON_ACCEPT), ("binary", AUDIO_ACCEPT)):
+        samples = [request(client, query, accept) for _ in range(runs)]
+        results[mode] = {key: np.median([s[key] for s in samples]) for key in ("bytes", "first_ms", "total_ms")}
+        r = results[mode]
+        print(f"{mode:8s} {samples[0]['type'][:18]:18s} {r['bytes']:9.0f} {r['first_ms']:14.1f} {r['total_ms']:9.1f}")
+
+    print(f"payload: {results['json']['bytes'] / results['binary']['bytes']:.2f}x smaller, "
+          f"first audio byte {results['json']['first_ms'] - results['binary']['first_ms']:.0f} ms sooner")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *(int(a) for a in sys.argv[2:3]))
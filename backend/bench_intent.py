@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for IntentClassifier.classify_batch vs the old
+per-intent cos_sim loop
+"""
+import sys
+import time
+from sentence_transformers import util
+from app import classifier, INTENT_EXAMPLES
+
+QUERIES = [
+    "swap history", "mera battery swap kitna hua", "nearest station kahan hai",
+    "find station near me", "plan status batao", "subscription kab khatam hoga",
+    "leave policy kya hai", "hello", "good morning bhai", "agent se baat karao",
+    "bye", "mujhe invoice samajh nahi aaya", "closest dsk", "how are you",
+    "transfer to human", "vacation days kitne bache hain",
+]
+
+
+def reference_classify(text, embeddings):
+    """The original per-intent cos_sim loop, kept as the ground truth."""
+    query_emb = classifier.model.encode(text)
+    best_intent, best_score = None, 0
+    for intent, emb in embeddings.items():
+        score = util.cos_sim(query_emb, emb).max().item()
+        if score > best_score:
+            best_intent, best_score = intent, score
+    return {"intent": best_intent if best_score > 0.5 else "open_talk", "confidence": best_score}
+
+
+def main(n=256, batch_size=32):
+    # Unique texts so the utterance cache doesn't hide model cost
+    texts = [f"{QUERIES[i % len(QUERIES)]} {i}" for i in range(n)]
+    embeddings = {intent: classifier.model.encode(ex) for intent, ex in INTENT_EXAMPLES.items()}
+
+    # Batch path must agree with the reference before timing anything
+    single = [reference_classify(t, embeddings) for t in QUERIES]
+    batched = classifier.classify_batch(QUERIES)
+    for text, a, b in zip(QUERIES, single, batched):
+        assert a["intent"] == b["intent"], (text, a, b)
+        assert abs(a["confidence"] - b["confidence"]) < 1e-4, (text, a, b)
+
+    start = time.perf_counter()
+    for text in texts:
+        reference_classify(text, embeddings)
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, n, batch_size):
+        classifier.classify_batch(texts[i:i + batch_size])
+    batch_time = time.perf_counter() - start
+
+    # Second pass over the same texts is served from the utterance cache
+    start = time.perf_counter()
+    for i in range(0, n, batch_size):
+        classifier.classify_batch(texts[i:i + batch_size])
+    cached_time = time.perf_counter() - start
+
+    print(f"per-intent loop: {n / single_time:8.1f} queries/s")
+    print(f"classify_batch:  {n / batch_time:8.1f} queries/s (batch={batch_size})")
+    print(f"cached repeat:   {n / cached_time:8.1f} queries/s")
+    print(f"speedup:         {single_time / batch_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check. Imports each module in a fresh interpreter with
+`python -X importtime` and fails (exit 1) if the cumulative import takes
+longer than the budget or pulls in a heavy dependency that should only
+load on first use or in warm_up().
+
+    python check_import_time.py [module ...] [--budget-ms 500] [--runs 3]
+
+tests/test_import_time.py runs the same check with pytest. The budget is
+compared with the best of `runs`, so a noisy machine does not fail it by
+accident.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Loaded lazily by IntentClassifier.load(), llm_client, tts_engine, asr_engine
+HEAVY_MODULES = (
+    "torch", "sentence_transformers", "transformers", "onnxruntime",
+    "groq", "elevenlabs", "speech_recognition", "pandas", "scipy"
+)
+
+DEFAULT_MODULES = ("app", "main")
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "500"))
+
+
+def import_profile(module):
+    """(cumulative ms, {imported module: cumulative ms}) for importing module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported[name.strip()] = int(cumulative) / 1000
+    return imported[module], imported
+
+
+def check(module, budget_ms, runs):
+    best, imported = min((import_profile(module) for _ in range(runs)), key=lambda r: r[0])
+    heavy = sorted(name for name in imported if name.split(".")[0] in HEAVY_MODULES)
+    ok = best <= budget_ms and not heavy
+
+    print(f"{'OK  ' if ok else 'FAIL'} import {module}: {best:.0f} ms (budget {budget_ms:.0f} ms)")
+    if heavy:
+        print(f"     heavy modules imported: {', '.join(name for name in heavy if '.' not in name) or heavy[0]}")
+    if not ok:
+        slowest = sorted(imported.items(), key=lambda item: item[1], reverse=True)[1:11]
+        for name, ms in slowest:
+            print(f"     {ms:8.1f} ms  {name}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    results = [check(module, args.budget_ms, args.runs) for module in args.modules]
+    sys.exit(0 if all(results) else 1)
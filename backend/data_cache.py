@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import sys
+import numpy as np
+
+FILE_PATH = "mock_invoice_dataset_fixed_dates.xlsx"
+META_FILE = "meta.json"
+# Bumped when the on-disk layout changes, so older caches are rebuilt
+CACHE_VERSION = 2
+
+
+def cache_root(source_path):
+    """Directory holding the columnar cache for source_path."""
+    return source_path + ".cache"
+
+
+def _generation(source_path):
+    # One cache directory per source version, so readers never see a
+    # half-written cache and a newer xlsx never matches an old one
+    st = os.stat(source_path)
+    return f"v{CACHE_VERSION}-{st.st_mtime_ns}-{st.st_size}"
+
+
+def write_cache(df, source_path):
+    """
+    Write df as one .npy file per column under the cache root for
+    source_path. Returns the generation directory.
+    """
+    root = cache_root(source_path)
+    gen_dir = os.path.join(root, _generation(source_path))
+    if os.path.isdir(gen_dir):
+        return gen_dir
+
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = os.path.join(root, f"tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        values = series.to_numpy()
+        entry = {"name": str(name), "file": f"col{i}.npy"}
+
+        mask = series.isna().to_numpy()
+        if values.dtype.kind in "biufM":
+            entry["kind"] = "native"
+        elif not all(isinstance(value, str) for value in values[~mask]):
+            # Mixed objects (numbers, Timestamps, None...) are pickled so
+            # they come back with the same types as from Excel; these
+            # columns are loaded into memory rather than mapped
+            entry["kind"] = "object"
+            values = values.astype(object)
+        else:
+            # Text columns are stored as fixed-width unicode so they can be
+            # memory-mapped too; missing values go in a mask
+            values = series.astype(str).to_numpy().astype(np.str_)
+            entry["kind"] = "text"
+            if mask.any():
+                entry["mask"] = f"col{i}.mask.npy"
+                np.save(os.path.join(tmp_dir, entry["mask"]), mask)
+
+        np.save(os.path.join(tmp_dir, entry["file"]), values, allow_pickle=entry["kind"] == "object")
+        columns.append(entry)
+
+    with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+        json.dump({"rows": len(df), "columns": columns}, f)
+
+    try:
+        os.rename(tmp_dir, gen_dir)
+    except OSError:
+        # Another worker published the same generation first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Drop stale generations
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if path != gen_dir and not name.startswith("tmp-"):
+            shutil.rmtree(path, ignore_errors=True)
+
+    return gen_dir
+
+
+def read_cache(gen_dir):
+    """
+    Load a cache generation. Numeric columns stay memory-mapped so worker
+    processes share the same page-cache pages (pandas >= 2 keeps them as
+    separate blocks with copy=False; 1.x consolidates them into copies).
+    """
+    import pandas as pd
+    with open(os.path.join(gen_dir, META_FILE)) as f:
+        meta = json.load(f)
+
+    data = {}
+    for entry in meta["columns"]:
+        path = os.path.join(gen_dir, entry["file"])
+        if entry["kind"] == "object":
+            # Written by write_cache above, never taken from elsewhere
+            data[entry["name"]] = np.load(path, allow_pickle=True)
+            continue
+        values = np.load(path, mmap_mode="r")
+        if entry["kind"] == "text":
+            values = values.astype(object)
+            if "mask" in entry:
+                values[np.load(os.path.join(gen_dir, entry["mask"]))] = None
+        data[entry["name"]] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+def load_dataset(source_path=FILE_PATH):
+    """
+    Return the dataset for source_path, from the columnar cache when it is
+    up to date, otherwise from Excel (regenerating the cache).
+    """
+    # pandas is imported with the first load, not with this module
+    import pandas as pd
+    gen_dir = os.path.join(cache_root(source_path), _generation(source_path))
+    if os.path.isfile(os.path.join(gen_dir, META_FILE)):
+        try:
+            return read_cache(gen_dir)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Data cache unreadable, falling back to Excel: {e}]")
+
+    df = pd.read_excel(source_path)
+    try:
+        write_cache(df, source_path)
+    except OSError as e:
+        print(f"[Data cache not written: {e}]")
+    return df
+
+
+if __name__ == "__main__":
+    # Conversion step: python data_cache.py [path/to/dataset.xlsx]
+    import pandas as pd
+    path = sys.argv[1] if len(sys.argv) > 1 else FILE_PATH
+    df = pd.read_excel(path)
+    print(f"Wrote {len(df)} rows to {write_cache(df, path)}")
@@ -0,0 +1,61 @@
+import os
+import threading
+from data_cache import load_dataset
+
+FILE_PATH = "mock_invoice_dataset_fixed_dates.xlsx"
+
+
+class DriverStore:
+    """
+    Loads the driver dataset once and keeps a driver_id -> row index in memory.
+    The file is re-read only when its mtime changes.
+    """
+
+    def __init__(self, file_path=FILE_PATH):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._data = None  # (df, index) swapped atomically on reload
+        self._mtime = None
+
+    def _load(self):
+        df = load_dataset(self.file_path)
+        # First occurrence wins, same as data.iloc[0] on the old boolean scan
+        index = {}
+        for pos, driver_id in enumerate(df["driver_id"]):
+            index.setdefault(driver_id, pos)
+        return df, index
+
+    def _refresh(self):
+        mtime = os.path.getmtime(self.file_path)
+        if self._data is not None and mtime == self._mtime:
+            return self._data
+        with self._lock:
+            if self._data is None or mtime != self._mtime:
+                self._data = self._load()
+                self._mtime = mtime
+            return self._data
+
+    def get_frame(self):
+        """Return the full dataset as a DataFrame."""
+        df, _ = self._refresh()
+        return df
+
+    def get_driver(self, driver_id):
+        """Return the row for driver_id as a Series, or None if not found."""
+        df, index = self._refresh()
+        pos = index.get(driver_id)
+        if pos is None:
+            return None
+        return df.iloc[pos]
+
+
+# Shared instance used by all resolvers
+store = DriverStore()
+
+
+def get_driver(driver_id):
+    return store.get_driver(driver_id)
+
+
+def get_frame():
+    return store.get_frame()
@@ -0,0 +1,244 @@
+"""
+Sentence-embedding backends for the intent classifier's MiniLM model.
+
+  torch       sentence-transformers on PyTorch, fp32 (the reference)
+  torch-int8  the same model with its Linear layers dynamically quantized
+  onnx        ONNX Runtime on an fp32 export of the model
+  onnx-int8   ONNX Runtime on the int8 dynamically quantized export
+
+EMBED_BACKEND picks one and EMBED_THREADS pins its intra-op thread count,
+so encode latency does not swing with whatever else the host is running.
+The ONNX backends load only onnxruntime and tokenizers (no PyTorch); the
+export is written once to EMBED_ONNX_DIR, by `python embedding_engine.py
+export` or on first use. Quantized and ONNX backends check themselves
+against fp32 reference embeddings at load; one whose cosine similarity
+drops below EMBED_TOLERANCE is replaced by the fp32 torch backend.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import numpy as np
+from dotenv import load_dotenv
+load_dotenv()
+
+EMBED_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", str(min(4, os.cpu_count() or 1))))
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR", os.path.join("models", "embeddings"))
+EMBED_TOLERANCE = float(os.getenv("EMBED_TOLERANCE", "0.99"))
+
+# Utterances embedded by the fp32 model at export time and re-embedded by
+# each backend at load, to check it still matches
+PROBE_SENTENCES = [
+    "mera swap history dikhao", "nearest station kahan hai", "subscription plan status",
+    "leave policy kya hai", "hello, how are you", "agent se baat karni hai",
+    "bahut bakwas service hai", "thank you so much, problem solve ho gaya",
+    "battery khatam ho gayi, paas mein koi station?", "bye",
+]
+
+
+def min_cosine(reference, candidate):
+    """Smallest row-wise cosine similarity between two embedding matrices."""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    dots = (reference * candidate).sum(axis=1)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return float((dots / np.maximum(norms, 1e-12)).min())
+
+
+def _check_tolerance(name, reference, candidate):
+    similarity = min_cosine(reference, candidate)
+    if similarity < EMBED_TOLERANCE:
+        print(f"[Embeddings] {name} drifts from fp32: min cosine {similarity:.4f} < {EMBED_TOLERANCE}")
+    return similarity
+
+
+class TorchEmbedder:
+    """sentence-transformers on PyTorch; quantize=True makes Linear layers int8."""
+
+    def __init__(self, model_name=EMBED_MODEL, threads=EMBED_THREADS, quantize=False):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self.name = "torch-int8" if quantize else "torch"
+        self.set_threads(threads)
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.min_cosine = 1.0
+        if quantize:
+            reference = self.encode(PROBE_SENTENCES)
+            torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            self.min_cosine = _check_tolerance(self.name, reference, self.encode(PROBE_SENTENCES))
+
+    def set_threads(self, threads):
+        import torch
+        self.threads = threads
+        torch.set_num_threads(threads)
+
+    def encode(self, texts):
+        return self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+
+
+def onnx_dir(model_name=EMBED_MODEL):
+    """Export directory for model_name under EMBED_ONNX_DIR."""
+    return os.path.join(EMBED_ONNX_DIR, re.sub(r"[^\w.-]+", "_", model_name).strip("_"))
+
+
+def export_onnx(model_name=EMBED_MODEL, out_dir=None):
+    """
+    Export model_name to ONNX (fp32 and int8), with its tokenizer, pooling
+    settings and fp32 reference embeddings. Needs PyTorch; runs once.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    out_dir = out_dir or onnx_dir(model_name)
+    os.makedirs(out_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    hf_model = getattr(transformer, "auto_model", None) or transformer.model
+    hf_model.eval()
+
+    inputs = model.tokenizer(["hello world"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in inputs]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class Encoder(torch.nn.Module):
+        # Keyword inputs and a single output, whatever the forward() signature
+        def __init__(self):
+            super().__init__()
+            self.model = hf_model
+
+        def forward(self, *args):
+            return self.model(**dict(zip(input_names, args))).last_hidden_state
+
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            Encoder(), tuple(inputs[name] for name in input_names), fp32_path,
+            input_names=input_names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic, opset_version=17, dynamo=False
+        )
+    quantize_dynamic(fp32_path, os.path.join(out_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+    model.tokenizer.backend_tokenizer.save(os.path.join(out_dir, "tokenizer.json"))
+    module_names = [type(module).__name__ for module in model]
+    pooling = model[1] if len(model) > 1 else None
+    meta = {
+        "model": model_name,
+        "max_seq_length": model.max_seq_length,
+        "pad_token": model.tokenizer.pad_token,
+        "pad_id": model.tokenizer.pad_token_id,
+        "pooling": "cls" if getattr(pooling, "pooling_mode_cls_token", False) else "mean",
+        "normalize": "Normalize" in module_names
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    np.save(os.path.join(out_dir, "reference.npy"), model.encode(PROBE_SENTENCES, convert_to_numpy=True))
+    return out_dir
+
+
+class ONNXEmbedder:
+    """
+    ONNX Runtime on an exported model, with tokenization by the Rust
+    `tokenizers` library and pooling done in NumPy.
+    """
+
+    def __init__(self, model_name=EMBED_MODEL, threads=EMBED_THREADS, quantize=False, model_dir=None):
+        from tokenizers import Tokenizer
+
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.dir = model_dir or onnx_dir(model_name)
+        self.path = os.path.join(self.dir, "model.int8.onnx" if quantize else "model.onnx")
+        if not os.path.isfile(os.path.join(self.dir, "meta.json")) or not os.path.isfile(self.path):
+            print(f"[Embeddings] exporting {model_name} to {self.dir}")
+            export_onnx(model_name, self.dir)
+
+        with open(os.path.join(self.dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.meta["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.meta["pad_id"], pad_token=self.meta["pad_token"])
+
+        self.threads = threads
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        reference = np.load(os.path.join(self.dir, "reference.npy"))
+        self.min_cosine = _check_tolerance(self.name, reference, self.encode(PROBE_SENTENCES))
+
+    def set_threads(self, threads):
+        with self._lock:
+            self.threads = threads
+            self._session = None
+
+    def _get_session(self):
+        # ONNX Runtime's thread pool does not survive fork, so every
+        # process (and every thread count change) gets its own session
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    import onnxruntime as ort
+                    options = ort.SessionOptions()
+                    options.intra_op_num_threads = self.threads
+                    options.inter_op_num_threads = 1
+                    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+                    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                    session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+                    self._input_names = {i.name for i in session.get_inputs()}
+                    self._session = session
+                    self._pid = os.getpid()
+        return self._session
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        encodings = self.tokenizer.encode_batch([texts] if single else list(texts))
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        session = self._get_session()
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = session.run(None, feeds)[0]
+
+        if self.meta["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        else:
+            weights = mask[:, :, None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        if self.meta["normalize"]:
+            pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled[0] if single else pooled
+
+
+def create_embedding_engine(backend=None, model_name=EMBED_MODEL, threads=EMBED_THREADS):
+    """
+    Build the backend named by `backend` or EMBED_BACKEND
+    ("torch" by default, "torch-int8", "onnx" or "onnx-int8").
+    A backend that drifts from the fp32 reference beyond EMBED_TOLERANCE
+    is dropped for the fp32 torch backend.
+    """
+    backend = (backend or EMBED_BACKEND).lower()
+    if backend in ("torch", "torch-int8"):
+        engine = TorchEmbedder(model_name, threads, quantize=backend == "torch-int8")
+    elif backend in ("onnx", "onnx-int8"):
+        engine = ONNXEmbedder(model_name, threads, quantize=backend == "onnx-int8")
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    if backend != "torch" and engine.min_cosine < EMBED_TOLERANCE:
+        print(f"[Embeddings] falling back from {backend} to fp32 torch")
+        engine = TorchEmbedder(model_name, threads)
+    return engine
+
+
+if __name__ == "__main__":
+    # Build step: python embedding_engine.py export [model name or path]
+    if sys.argv[1:2] != ["export"]:
+        sys.exit("usage: python embedding_engine.py export [model]")
+    model_name = sys.argv[2] if len(sys.argv) > 2 else EMBED_MODEL
+    print(f"Exported {model_name} to {export_onnx(model_name)}")
@@ -0,0 +1,6 @@
+# Picked up by gunicorn from the working directory (see Dockerfile CMD)
+
+def post_worker_init(worker):
+    # Load the intent model, data and clients before the worker takes traffic
+    from app import warm_up
+    warm_up()
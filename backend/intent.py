@@ -1,5 +1,7 @@
 import re
-from typing import Tuple, Optional
+import threading
+from collections import deque
+from typing import Dict, Optional, Set, Tuple
 
 # Intent keywords for matching
 INTENT_KEYWORDS = {
@@ -34,6 +36,117 @@ INTENT_KEYWORDS = {
 }
 
 
+# Words that always defer to the neural classifier (handoff / end chat),
+# so a keyword hit can never swallow an escalation request
+PASS_THROUGH_KEYWORDS = [
+    "agent", "human", "transfer", "escalate",
+    "bye", "goodbye", "end", "close", "finish"
+]
+
+# Keyword router thresholds: the best score (two or more keyword hits)
+# must beat the runner-up by ROUTER_MIN_MARGIN to skip the transformer
+ROUTER_MIN_CONFIDENCE = 0.2
+ROUTER_MIN_MARGIN = 0.1
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of patterns.
+    One pass over the text finds every pattern that occurs as a substring.
+    """
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+
+        for pattern in patterns:
+            node = 0
+            for ch in pattern:
+                if ch not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.output[node].add(pattern)
+
+        # Breadth-first pass to fill failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                self.output[child] |= self.output[self.fail[child]]
+
+    def find_all(self, text: str) -> Set[str]:
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            if self.output[node]:
+                found |= self.output[node]
+        return found
+
+
+def _build_matcher():
+    # Patterns are padded with spaces and matched against the query's words
+    # joined the same way, so "end" matches "end" but not "weekend" or
+    # "pending"; a trailing "s" is allowed for plurals ("stations")
+    keywords = set(PASS_THROUGH_KEYWORDS)
+    for intent_data in INTENT_KEYWORDS.values():
+        keywords.update(intent_data["keywords"])
+        keywords.update(intent_data["aliases"])
+    patterns = {}
+    for keyword in keywords:
+        patterns[f" {keyword} "] = keyword
+        patterns.setdefault(f" {keyword}s ", keyword)
+    return KeywordMatcher(patterns), patterns
+
+
+_matcher, _pattern_keywords = _build_matcher()
+
+
+def find_keywords(text: str) -> Set[str]:
+    """Keywords (including pass-through words) that occur as whole words in text."""
+    words = " " + " ".join(re.findall(r"[a-z]+", text.lower())) + " "
+    return {_pattern_keywords[pattern] for pattern in _matcher.find_all(words)}
+
+
+def _confidence(matched: Set[str], intent: str) -> float:
+    intent_data = INTENT_KEYWORDS[intent]
+
+    # Count keyword matches
+    keyword_matches = sum(1 for kw in intent_data["keywords"] if kw in matched)
+    alias_matches = sum(1 for alias in intent_data["aliases"] if alias in matched)
+
+    # Calculate base confidence
+    total_keywords = len(intent_data["keywords"])
+    confidence = (keyword_matches + alias_matches * 0.7) / total_keywords
+
+    return min(confidence, 1.0)
+
+
+def score_intents(user_query: str) -> Dict[str, float]:
+    """
+    Score every intent with a single scan of the query.
+
+    Args:
+        user_query: The user's input query
+
+    Returns:
+        Dict of intent -> confidence score (0.0 to 1.0)
+    """
+    matched = find_keywords(user_query)
+    return {intent: _confidence(matched, intent) for intent in INTENT_KEYWORDS}
+
+
 def calculate_intent_confidence(user_query: str, intent: str) -> float:
     """
     Calculate confidence score for a detected intent (0.0 to 1.0)
@@ -45,18 +158,7 @@ def calculate_intent_confidence(user_query: str, intent: str) -> float:
     Returns:
         Confidence score between 0.0 and 1.0
     """
-    query_lower = user_query.lower()
-    intent_data = INTENT_KEYWORDS[intent]
-    
-    # Count keyword matches
-    keyword_matches = sum(1 for kw in intent_data["keywords"] if kw in query_lower)
-    alias_matches = sum(1 for alias in intent_data["aliases"] if alias in query_lower)
-    
-    # Calculate base confidence
-    total_keywords = len(intent_data["keywords"])
-    confidence = (keyword_matches + alias_matches * 0.7) / total_keywords
-    
-    return min(confidence, 1.0)
+    return _confidence(find_keywords(user_query), intent)
 
 
 def detect_intent(user_query: str) -> Tuple[Optional[str], float]:
@@ -75,10 +177,7 @@ def detect_intent(user_query: str) -> Tuple[Optional[str], float]:
         return None, 0.0
     
     # Calculate confidence for each intent
-    intent_scores = {}
-    for intent in INTENT_KEYWORDS.keys():
-        confidence = calculate_intent_confidence(user_query, intent)
-        intent_scores[intent] = confidence
+    intent_scores = score_intents(user_query)
     
     # Get the highest scoring intent
     best_intent = max(intent_scores, key=intent_scores.get)
@@ -87,6 +186,51 @@ def detect_intent(user_query: str) -> Tuple[Optional[str], float]:
     return best_intent, best_confidence
 
 
+class KeywordRouter:
+    """
+    First-stage router: answers clear keyword hits directly and lets
+    ambiguous queries fall through to the neural classifier.
+    """
+
+    def __init__(self, min_confidence=ROUTER_MIN_CONFIDENCE, min_margin=ROUTER_MIN_MARGIN):
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.short_circuited = 0
+
+    def route(self, user_query: str) -> Tuple[Optional[str], float]:
+        """
+        Returns:
+            (intent, confidence) for a confident hit, else (None, 0.0)
+        """
+        intent, confidence = None, 0.0
+        if user_query and user_query.strip():
+            matched = find_keywords(user_query)
+            if not any(kw in matched for kw in PASS_THROUGH_KEYWORDS):
+                scores = sorted(
+                    ((_confidence(matched, i), i) for i in INTENT_KEYWORDS),
+                    reverse=True
+                )
+                (best, best_intent), (runner_up, _) = scores[0], scores[1]
+                if best >= self.min_confidence and best - runner_up >= self.min_margin:
+                    intent, confidence = best_intent, best
+
+        with self._lock:
+            self.queries += 1
+            if intent is not None:
+                self.short_circuited += 1
+        return intent, confidence
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "short_circuited": self.short_circuited,
+                "fraction": self.short_circuited / self.queries if self.queries else 0.0
+            }
+
+
 def handle_intent_result(intent: Optional[str], confidence: float) -> str:
     """
     Handle the intent detection result.
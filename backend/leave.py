@@ -1,16 +1,10 @@
-import pandas as pd
-
-FILE_PATH = "mock_invoice_dataset_fixed_dates.xlsx"
+from driver_store import get_driver
 
 def get_leave_and_activation_info(driver_id: str) -> str:
-    df = pd.read_excel(FILE_PATH)
-
-    data = df[df["driver_id"] == driver_id]
-    if data.empty:
+    row = get_driver(driver_id)
+    if row is None:
         return f"No leave or activation info found for driver {driver_id}."
 
-    row = data.iloc[0]
-
     return (
         f"Leave & Activation Info for Driver {driver_id}:\n"
         f"- Leave status: {row['leave_info']}\n"
@@ -1,14 +1,12 @@
 import asyncio
 import speech_recognition as sr
-import io
-import wave
-import tempfile
 from livekit.agents import JobContext, WorkerOptions, cli
 from livekit import rtc
 from dotenv import load_dotenv
-from app import process_query
-from tts import speak_text
-import numpy as np
+from app import process_query, warm_up
+from asr_engine import get_asr_engine
+from audio_ingest import Resampler, ASR_SAMPLE_RATE
+from vad import Endpointer, SPEECH_START, SPEECH_END
 
 load_dotenv()
 
@@ -24,58 +22,69 @@ async def entrypoint(ctx: JobContext):
 
 async def process_audio_stream(ctx: JobContext, input_track: rtc.Track, user_id: str):
     audio_stream = rtc.AudioStream(input_track)
-    recognizer = sr.Recognizer()
+    asr = get_asr_engine()
     
     # Create output source for TTS
     source = rtc.AudioSource(48000, 1)
     output_track = rtc.LocalAudioTrack.create_audio_track("ai_response", source)
     await ctx.room.local_participant.publish_track(output_track)
     
-    audio_buffer = []
+    # Frames arrive at 48 kHz; VAD and ASR only need 16 kHz mono.
+    # Only speech between real endpoints reaches ASR; local engines
+    # decode it while the user is still talking
+    resampler = Resampler(48000, ASR_SAMPLE_RATE)
+    endpointer = Endpointer(ASR_SAMPLE_RATE)
+    stream = None
+    last_partial = ""
     
     async for event in audio_stream:
         frame = event.frame
         
-        # Convert frame to numpy array
-        audio_data = np.frombuffer(frame.data, dtype=np.int16)
-        audio_buffer.extend(audio_data)
-        
-        # Process every 3 seconds of audio
-        if len(audio_buffer) >= 48000 * 3:  # 3 seconds at 48kHz
+        for vad_event in endpointer.process(resampler.process(frame.data)):
+            if vad_event.kind == SPEECH_START:
+                stream = asr.create_stream(ASR_SAMPLE_RATE)
+                last_partial = ""
+            
+            if stream is None:
+                continue  # this utterance already failed; wait for the next one
+            
+            if vad_event.kind != SPEECH_END:
+                try:
+                    partial = stream.accept(vad_event.audio)
+                except Exception as e:
+                    # A local engine failing mid-utterance drops only that
+                    # utterance, not the participant's audio loop
+                    print(f"Audio processing error: {e}")
+                    stream = None
+                    continue
+                if partial and partial.text and partial.text != last_partial:
+                    last_partial = partial.text
+                    print(f"Partial: {partial.text}")
+                continue
+            
+            # SPEECH_END: the utterance is complete
             try:
-                # Convert to wav format for speech recognition
-                audio_array = np.array(audio_buffer, dtype=np.int16)
+                text = stream.finish().text
+                print(f"Recognized: {text}")
                 
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                    with wave.open(temp_file.name, 'wb') as wav_file:
-                        wav_file.setnchannels(1)
-                        wav_file.setsampwidth(2)
-                        wav_file.setframerate(48000)
-                        wav_file.writeframes(audio_array.tobytes())
-                    
-                    # Speech recognition
-                    with sr.AudioFile(temp_file.name) as audio_source:
-                        audio = recognizer.record(audio_source)
-                        try:
-                            text = recognizer.recognize_google(audio)
-                            print(f"Recognized: {text}")
-                            
-                            # Process with your existing logic
-                            response, should_end = process_query(user_id, text, user_id)
-                            print(f"Response: {response}")
-                            
-                            # Generate TTS audio and stream back
-                            # You'll need to modify speak_text to return audio data instead of playing
-                            
-                        except sr.UnknownValueError:
-                            pass  # No speech detected
-                        except sr.RequestError as e:
-                            print(f"Speech recognition error: {e}")
+                # Process with your existing logic
+                response, should_end = process_query(user_id, text, user_id)
+                print(f"Response: {response}")
                 
-                audio_buffer = []  # Clear buffer
+                # Generate TTS audio and stream back
+                # You'll need to modify speak_text to return audio data instead of playing
                 
+            except sr.UnknownValueError:
+                pass  # No speech detected
+            except sr.RequestError as e:
+                print(f"Speech recognition error: {e}")
             except Exception as e:
                 print(f"Audio processing error: {e}")
+            stream = None
+
+def prewarm(proc):
+    # Runs once per agent process, before it takes jobs
+    warm_up()
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
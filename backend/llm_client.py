@@ -0,0 +1,122 @@
+import os
+import threading
+from dotenv import load_dotenv
+load_dotenv()
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# Connection/retry settings, overridable from the environment
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "15"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # e.g. a local stub server for tests
+
+_lock = threading.Lock()
+_client = None
+_async_client = None
+
+
+def _client_kwargs():
+    kwargs = {
+        "api_key": os.getenv("GROQ_API_KEY"),
+        "timeout": GROQ_TIMEOUT,
+        "max_retries": GROQ_MAX_RETRIES,
+    }
+    if GROQ_BASE_URL:
+        kwargs["base_url"] = GROQ_BASE_URL
+    return kwargs
+
+
+def _limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_MAX_CONNECTIONS
+    )
+
+
+def _reset_after_fork():
+    global _client, _async_client, _lock
+    _client = None
+    _async_client = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client():
+    """Shared Groq client; its HTTP connections are kept alive and reused."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                # groq and httpx are imported on first use, not with this module
+                import httpx
+                from groq import Groq
+                _client = Groq(
+                    http_client=httpx.Client(limits=_limits(), timeout=GROQ_TIMEOUT),
+                    **_client_kwargs()
+                )
+    return _client
+
+
+def get_async_client():
+    """Shared AsyncGroq client for asyncio servers."""
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                import httpx
+                from groq import AsyncGroq
+                _async_client = AsyncGroq(
+                    http_client=httpx.AsyncClient(limits=_limits(), timeout=GROQ_TIMEOUT),
+                    **_client_kwargs()
+                )
+    return _async_client
+
+
+def complete(messages, model=DEFAULT_MODEL, max_tokens=50):
+    """Blocking chat completion; returns the reply text."""
+    response = get_client().chat.completions.create(
+        messages=messages,
+        model=model,
+        max_tokens=max_tokens
+    )
+    return response.choices[0].message.content
+
+
+def stream_complete(messages, model=DEFAULT_MODEL, max_tokens=50):
+    """Blocking streaming completion; yields text deltas as they arrive."""
+    stream = get_client().chat.completions.create(
+        messages=messages,
+        model=model,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def acomplete(messages, model=DEFAULT_MODEL, max_tokens=50):
+    """Async chat completion; returns the reply text."""
+    response = await get_async_client().chat.completions.create(
+        messages=messages,
+        model=model,
+        max_tokens=max_tokens
+    )
+    return response.choices[0].message.content
+
+
+async def astream_complete(messages, model=DEFAULT_MODEL, max_tokens=50):
+    """Async streaming completion; yields text deltas as they arrive."""
+    stream = await get_async_client().chat.completions.create(
+        messages=messages,
+        model=model,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Concurrent-session load test for the voice server's Socket.IO audio path.
+
+Each simulated caller connects, sends recorded utterances on
+'audio_stream' (the same payload WebCall sends) and waits for the turn's
+final 'ai_response'. Concurrency is stepped up level by level, and the
+capacity is the highest level whose p95 turn latency stays within the SLO
+with nothing rejected.
+
+Needs the asyncio Socket.IO client (pip install aiohttp). To load the
+server without external services, start it with e.g.
+
+    TTS_BACKEND=local LOCAL_TTS_LATENCY_MS=150 \\
+    ASR_BACKEND=static ASR_STATIC_LATENCY_MS=300 \\
+    SOCKETIO_ASYNC_MODE=gevent python voice_server.py
+
+and point GROQ_BASE_URL at a test endpoint (or use a real key).
+
+    python load_test_voice.py --url http://localhost:5000 --levels 1,5,10,20,40
+"""
+import argparse
+import asyncio
+import base64
+import io
+import time
+import wave
+import numpy as np
+import socketio
+
+
+def utterance_data_url(seconds=1.5, rate=16000):
+    t = np.arange(int(seconds * rate)) / rate
+    samples = (np.sin(2 * np.pi * 180 * t) * 6000).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(samples.tobytes())
+    return "data:audio/wav;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+async def caller(url, user_id, turns, audio, timeout, results):
+    client = socketio.AsyncClient(reconnection=False)
+    turn_done = asyncio.Event()
+    turn = {}
+
+    @client.on("ai_audio_chunk")
+    async def on_chunk(frame):
+        turn.setdefault("first_audio", time.perf_counter())
+
+    @client.on("ai_response")
+    async def on_response(data):
+        if data.get("audio"):
+            turn.setdefault("first_audio", time.perf_counter())
+        if data.get("isFinal"):
+            turn["status"] = "ok"
+            turn_done.set()
+
+    @client.on("error")
+    async def on_error(data):
+        turn["status"] = "rejected" if "busy" in str(data).lower() else "error"
+        turn_done.set()
+
+    try:
+        # driver_id keeps the session on one worker behind prefork.py's router
+        await client.connect(f"{url}/?driver_id={user_id}", transports=["websocket"])
+    except Exception:
+        await client.disconnect()
+        results.extend({"status": "connect_failed"} for _ in range(turns))
+        return
+
+    for _ in range(turns):
+        turn.clear()
+        turn_done.clear()
+        start = time.perf_counter()
+        await client.emit("audio_stream", {"data": audio, "userId": user_id, "streamAudio": True})
+        try:
+            await asyncio.wait_for(turn_done.wait(), timeout)
+        except asyncio.TimeoutError:
+            turn["status"] = "timeout"
+        end = time.perf_counter()
+        results.append({
+            "status": turn.get("status"),
+            "total": end - start,
+            "first_audio": turn.get("first_audio", end) - start
+        })
+    await client.disconnect()
+
+
+async def run_level(url, sessions, turns, audio, timeout, driver_ids):
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        caller(url, driver_ids[i % len(driver_ids)] if driver_ids else f"load-{i}", turns, audio, timeout, results)
+        for i in range(sessions)
+    ))
+    return results, time.perf_counter() - start
+
+
+def pct(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else float("nan")
+
+
+async def main(args):
+    audio = utterance_data_url()
+    levels = [int(x) for x in args.levels.split(",")]
+    driver_ids = args.driver_ids.split(",") if args.driver_ids else None
+    capacity = 0
+
+    print(f"{'sessions':>8s} {'ok':>5s} {'rejected':>8s} {'failed':>6s} "
+          f"{'p50 ms':>8s} {'p95 ms':>8s} {'p50 1st audio':>13s} {'turns/s':>8s}")
+    for sessions in levels:
+        results, elapsed = await run_level(args.url, sessions, args.turns, audio, args.timeout, driver_ids)
+        ok = [r for r in results if r["status"] == "ok"]
+        rejected = sum(1 for r in results if r["status"] == "rejected")
+        failed = len(results) - len(ok) - rejected
+        totals = [r["total"] for r in ok]
+        p95 = pct(totals, 95)
+        print(f"{sessions:8d} {len(ok):5d} {rejected:8d} {failed:6d} "
+              f"{pct(totals, 50):8.0f} {p95:8.0f} {pct([r['first_audio'] for r in ok], 50):13.0f} "
+              f"{len(ok) / elapsed:8.1f}")
+        if ok and not rejected and not failed and p95 <= args.slo_ms:
+            capacity = sessions
+    print(f"capacity: {capacity} concurrent sessions within p95 <= {args.slo_ms:.0f} ms")
+    return capacity
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--levels", default="1,5,10,20,40")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--slo-ms", type=float, default=3000.0)
+    parser.add_argument("--driver-ids", help="comma-separated; default: one id per caller")
+    asyncio.run(main(parser.parse_args()))
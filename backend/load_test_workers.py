@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Local multi-worker load test: starts prefork.py with 1, 2, 4... workers,
+runs the load_test_voice.py levels against its sticky router and reports
+the session capacity and worker memory for each worker count.
+
+Worker memory is shown as RSS and PSS (shared pages split between the
+processes sharing them); with the model loaded before the fork, total PSS
+grows far slower than RSS as workers are added.
+
+Start options for the server (TTS_BACKEND, ASR_BACKEND, GROQ_BASE_URL...)
+come from the environment, see load_test_voice.py.
+
+    python load_test_workers.py --workers 1,2,4 --levels 5,10,20,40
+"""
+import argparse
+import asyncio
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+import load_test_voice
+
+
+def wait_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/metrics", timeout=2):
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def worker_memory(parent_pid):
+    """Summed RSS and PSS (MiB) of the launcher's worker processes."""
+    rss = pss = 0
+    with open(f"/proc/{parent_pid}/task/{parent_pid}/children") as f:
+        children = f.read().split()
+    for pid in children:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except FileNotFoundError:
+            pass
+    return len(children), rss / 1024, pss / 1024
+
+
+def run(args, workers):
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, WEB_WORKERS=str(workers), PORT=str(args.port))
+    server = subprocess.Popen(shlex.split(args.server), env=env, start_new_session=True)
+    try:
+        if not wait_ready(url, args.startup_timeout):
+            raise RuntimeError(f"server with {workers} workers did not start")
+        print(f"\n== {workers} worker(s)")
+        capacity = asyncio.run(load_test_voice.main(argparse.Namespace(
+            url=url, levels=args.levels, turns=args.turns, timeout=args.timeout,
+            slo_ms=args.slo_ms, driver_ids=None
+        )))
+        return (capacity,) + worker_memory(server.pid)
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
+
+
+def main(args):
+    rows = [(workers,) + run(args, workers) for workers in (int(x) for x in args.workers.split(","))]
+    print(f"\n{'workers':>7s} {'capacity':>8s} {'procs':>5s} {'RSS MiB':>8s} {'PSS MiB':>8s}")
+    for workers, capacity, procs, rss, pss in rows:
+        print(f"{workers:7d} {capacity:8d} {procs:5d} {rss:8.0f} {pss:8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--levels", default="5,10,20,40")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--slo-ms", type=float, default=3000.0)
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--server", default=f"{sys.executable} prefork.py",
+                        help="launcher command; WEB_WORKERS and PORT are set for it")
+    main(parser.parse_args())
@@ -1,7 +1,8 @@
-import pandas as pd
 import math
+from driver_store import get_driver, get_frame
+from station_index import StationIndex
 
-FILE_PATH = "mock_invoice_dataset_fixed_dates.xlsx"
+_index_cache = (None, None)  # (df, StationIndex) built from the current dataset
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     """
@@ -22,31 +23,56 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     return R * c
 
 
-def get_nearest_station(driver_id: str) -> str:
-    df = pd.read_excel(FILE_PATH)
+def get_station_index():
+    """
+    Return the StationIndex for the current dataset, rebuilding it only
+    when the driver store has reloaded the file.
+    """
+    global _index_cache
+    df = get_frame()
+    cached_df, index = _index_cache
+    if cached_df is not df:
+        index = StationIndex(df["latitude"].to_numpy(), df["longitude"].to_numpy())
+        _index_cache = (df, index)
+    return df, index
 
-    driver_data = df[df["driver_id"] == driver_id]
-    if driver_data.empty:
+
+def find_nearest_stations(lat, lon, k=1, radius_km=None):
+    """
+    Return up to k (DSK ID, distance_km) pairs nearest to (lat, lon),
+    one entry per DSK, optionally limited to radius_km.
+    """
+    df, index = get_station_index()
+    dsk_ids = df["nearest_DSK_for_activation"].to_numpy()
+
+    # Several rows can point at the same DSK, so widen the search until
+    # k distinct stations are found or the index is exhausted
+    fetch = k
+    while True:
+        results = []
+        seen = set()
+        hits = index.nearest(lat, lon, k=fetch, radius_km=radius_km)
+        for pos, distance in hits:
+            dsk = dsk_ids[pos]
+            if dsk not in seen:
+                seen.add(dsk)
+                results.append((dsk, distance))
+            if len(results) == k:
+                return results
+        if len(hits) < fetch or fetch >= index.size:
+            return results
+        fetch *= 2
+
+
+def get_nearest_station(driver_id: str) -> str:
+    driver_row = get_driver(driver_id)
+    if driver_row is None:
         return f"No location data found for driver {driver_id}."
 
-    driver_row = driver_data.iloc[0]
     driver_lat = 26.421418
     driver_lon = 80.402548
-    
-    nearest_station = None
-    min_distance = float("inf")
-
-    for _, row in df.iterrows():
-        station_lat = row["latitude"]
-        station_lon = row["longitude"]
-
-        distance = haversine_distance(
-            driver_lat, driver_lon, station_lat, station_lon
-        )
 
-        if distance < min_distance:
-            min_distance = distance
-            nearest_station = row["nearest_DSK_for_activation"]
+    nearest_station, min_distance = find_nearest_stations(driver_lat, driver_lon, k=1)[0]
 
     return (
         f"Nearest Battery Smart Station for Driver {driver_id}:\n"
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Multi-process mode for the voice server.
+
+The launcher imports voice_server and runs its warm-up once, so the
+SentenceTransformer, the data cache and the rest of the app are loaded
+before forking; the workers then share those pages copy-on-write instead
+of each loading its own copy. Every worker serves on its own local port
+behind a sticky router on the public port:
+
+  - a Socket.IO session's polling requests and its WebSocket upgrade all
+    carry the same driver_id query parameter (or come from the same
+    address), so they hash to the same worker
+  - conversation memory defaults to the SQLite session store, so context
+    survives a driver landing on another worker (SESSION_BACKEND=redis to
+    share it across hosts)
+
+Dead workers are forked again from the already loaded parent.
+
+    WEB_WORKERS=4 python prefork.py [--port 5000]
+
+Behind an external load balancer (nginx `hash $arg_driver_id`, ALB sticky
+sessions) run with --no-router and point it at the worker ports.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, parse_qs
+
+# Conversation context must outlive the worker a driver happens to hit
+os.environ.setdefault("SESSION_BACKEND", "sqlite")
+
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 2)))
+WORKER_BASE_PORT = int(os.getenv("WORKER_BASE_PORT", "5100"))
+# Intra-op threads per worker for the embedding model (unset: split the CPUs)
+WORKER_EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))
+
+# The parent runs the model single-threaded while warming up, so no
+# OpenMP thread pool exists at fork time (it is not fork-safe)
+os.environ["EMBED_THREADS"] = "1"
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+# Query parameter that pins a client to one worker
+AFFINITY_PARAM = "driver_id"
+MAX_HEAD_BYTES = 64 * 1024
+
+
+def worker_port(index):
+    return WORKER_BASE_PORT + index
+
+
+class StickyRouter:
+    """
+    TCP front for the workers. Reads the request head to pick a worker by
+    hashing the affinity key, then relays bytes both ways. Plain HTTP
+    requests are forwarded with Connection: close, so each polling request
+    is routed on its own; WebSocket upgrades stay tunneled to one worker.
+    """
+
+    def __init__(self, host, port, backends):
+        self.backends = backends
+        self.listener = socket.create_server((host, port), backlog=1024)
+        self.routed = [0] * len(backends)
+
+    def serve_forever(self):
+        while True:
+            client, address = self.listener.accept()
+            threading.Thread(target=self._handle, args=(client, address), daemon=True).start()
+
+    def affinity_key(self, head, address):
+        request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        parts = request_line.split(" ")
+        if len(parts) >= 2:
+            values = parse_qs(urlsplit(parts[1]).query).get(AFFINITY_PARAM)
+            if values and values[0]:
+                return values[0]
+        return address[0]
+
+    def _handle(self, client, address):
+        backend = None
+        try:
+            head, rest = self._read_head(client)
+            if head is None:
+                return
+            index = zlib.crc32(self.affinity_key(head, address).encode()) % len(self.backends)
+            backend = self._connect(index)
+            if backend is None:
+                client.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            backend.sendall(self._rewrite(head) + rest)
+            threading.Thread(target=self._pipe, args=(backend, client), daemon=True).start()
+            self._pipe(client, backend)
+        except OSError:
+            pass
+        finally:
+            client.close()
+            if backend is not None:
+                backend.close()
+
+    def _read_head(self, client):
+        data = b""
+        while b"\r\n\r\n" not in data:
+            chunk = client.recv(65536)
+            if not chunk or len(data) > MAX_HEAD_BYTES:
+                return None, b""
+            data += chunk
+        head, rest = data.split(b"\r\n\r\n", 1)
+        return head, rest
+
+    def _rewrite(self, head):
+        lines = head.split(b"\r\n")
+        if any(line.lower().startswith(b"upgrade:") for line in lines[1:]):
+            return head + b"\r\n\r\n"
+        lines = [lines[0]] + [
+            line for line in lines[1:]
+            if not line.lower().startswith((b"connection:", b"keep-alive:"))
+        ]
+        return b"\r\n".join(lines + [b"Connection: close"]) + b"\r\n\r\n"
+
+    def _connect(self, index):
+        # A worker being restarted hands its keys to the next one
+        for offset in range(len(self.backends)):
+            candidate = (index + offset) % len(self.backends)
+            try:
+                backend = socket.create_connection(self.backends[candidate], timeout=5)
+            except OSError:
+                continue
+            backend.settimeout(None)
+            self.routed[candidate] += 1
+            return backend
+        return None
+
+    def _pipe(self, source, target):
+        try:
+            while True:
+                chunk = source.recv(65536)
+                if not chunk:
+                    break
+                target.sendall(chunk)
+        except OSError:
+            pass
+        finally:
+            try:
+                target.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+
+def run_worker(index, port, workers):
+    """Body of a forked worker; never returns."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    os.environ["WORKER_INDEX"] = str(index)
+    import voice_server
+    voice_server.classifier.model.set_threads(WORKER_EMBED_THREADS or max(1, (os.cpu_count() or 1) // workers))
+    try:
+        if index == 0:
+            # The TTS cache is on disk, so one worker warms it for all
+            voice_server.socketio.start_background_task(voice_server.prewarm_tts)
+        print(f"Worker {index} (pid {os.getpid()}) on 127.0.0.1:{port}")
+        voice_server.socketio.run(voice_server.app, host="127.0.0.1", port=port,
+                                  debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
+    finally:
+        os._exit(1)
+
+
+def spawn(index, port, workers, router=None):
+    pid = os.fork()
+    if pid == 0:
+        if router is not None:
+            router.listener.close()
+        run_worker(index, port, workers)
+    return pid
+
+
+def main(args):
+    start = time.perf_counter()
+    import voice_server
+    # Models and clients are lazy; load them here so workers inherit them
+    voice_server.warm_up()
+    print(f"Loaded app in {time.perf_counter() - start:.1f}s, forking {args.workers} workers")
+
+    # Keep the garbage collector from touching (and so copying) the
+    # parent's objects in every worker
+    gc.collect()
+    gc.freeze()
+
+    ports = [worker_port(i) for i in range(args.workers)]
+    router = None
+    if not args.no_router:
+        router = StickyRouter(args.host, args.port, [("127.0.0.1", port) for port in ports])
+    workers = {spawn(i, port, args.workers, router): i for i, port in enumerate(ports)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if router is not None:
+        threading.Thread(target=router.serve_forever, daemon=True).start()
+        print(f"Sticky router on {args.host}:{args.port} -> ports {ports[0]}-{ports[-1]}")
+
+    while not stopping:
+        try:
+            # waitpid, unlike wait, is cooperative under gevent/eventlet
+            pid, status = os.waitpid(-1, 0)
+        except ChildProcessError:
+            time.sleep(1)
+            continue
+        index = workers.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+        time.sleep(1)
+        workers[spawn(index, ports[index], args.workers, router)] = index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument("--no-router", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,94 @@
+import numpy as np
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "raise")
+
+
+class PCMRingBuffer:
+    """
+    Preallocated int16 ring buffer for live PCM.
+
+    Positions are absolute sample counts since the start of the stream, so
+    a reader can keep its own cursor and look back at audio it has already
+    consumed (e.g. VAD pre-roll) for as long as it has not been overwritten.
+    Reads return views into the buffer and copy only when a range wraps
+    around the end; views are valid until the next write.
+
+    overflow decides what happens when a write would overwrite unread audio:
+      drop_oldest  advance the read cursor past the oldest unread samples
+      drop_newest  keep the unread audio and discard the excess input
+      raise        raise BufferError
+    """
+
+    def __init__(self, capacity, overflow="drop_oldest"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.written = 0    # samples written since the start
+        self.consumed = 0   # read cursor, in the same units
+        self.dropped = 0
+
+    def __len__(self):
+        """Unread samples."""
+        return self.written - self.consumed
+
+    def write(self, pcm):
+        """Append 16-bit PCM given as bytes, a memoryview or an int16 array."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        free = self.capacity - len(self)
+        if len(samples) > free:
+            excess = len(samples) - free
+            if self.overflow == "raise":
+                raise BufferError(f"Ring buffer overflow by {excess} samples")
+            self.dropped += excess
+            if self.overflow == "drop_newest":
+                samples = samples[:free]
+            elif excess > len(self):
+                # The input alone overflows: only its tail survives
+                samples = samples[-self.capacity:]
+                self.written += excess - len(self)
+                self.consumed = self.written
+            else:
+                self.consumed += excess
+
+        n = len(samples)
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+        self.written += n
+        return n
+
+    def _range(self, start, n):
+        offset = start % self.capacity
+        if offset + n <= self.capacity:
+            return self.buffer[offset:offset + n]
+        return np.concatenate((self.buffer[offset:], self.buffer[:offset + n - self.capacity]))
+
+    def peek(self, n):
+        """Next n unread samples (fewer if not available) without consuming them."""
+        return self._range(self.consumed, min(n, len(self)))
+
+    def read(self, n):
+        """Consume and return the next n unread samples (fewer if not available)."""
+        samples = self.peek(n)
+        self.consumed += len(samples)
+        return samples
+
+    def history(self, n):
+        """Up to n already-consumed samples just before the read cursor."""
+        oldest = max(self.written - self.capacity, 0)
+        n = min(n, self.consumed - oldest)
+        return self._range(self.consumed - n, n)
+
+    def clear(self):
+        self.consumed = self.written
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "unread": len(self),
+            "written": self.written,
+            "dropped": self.dropped
+        }
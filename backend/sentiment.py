@@ -0,0 +1,156 @@
+import os
+import re
+import numpy as np
+import llm_client
+
+# -------------------------
+# HINGLISH LEXICON
+# -------------------------
+# Word -> polarity. Strong words count double.
+SENTIMENT_LEXICON = {
+    # negative (Hindi / Hinglish)
+    "bakwas": -2, "bekaar": -1.5, "bekar": -1.5, "ghatiya": -2, "faltu": -1.5,
+    "pareshan": -1, "pareshaan": -1, "gussa": -1.5, "naraz": -1.5, "naraaz": -1.5,
+    "bura": -1, "kharab": -1, "galat": -1, "dhokha": -2, "chor": -2, "loot": -2,
+    "bewakoof": -1.5, "dikkat": -1, "takleef": -1, "tang": -1,
+    # negative (English)
+    "bad": -1, "worst": -2, "terrible": -2, "horrible": -2, "awful": -2,
+    "angry": -1.5, "frustrated": -1.5, "useless": -1.5, "hate": -2,
+    "problem": -0.5, "issue": -0.5, "complaint": -1, "fraud": -2, "cheat": -2,
+    "pathetic": -2, "ridiculous": -1.5, "disgusting": -2, "stupid": -1.5,
+    "late": -0.5, "wrong": -1, "broken": -1, "scam": -2,
+    # positive (Hindi / Hinglish)
+    "accha": 1, "achha": 1, "acha": 1, "badhiya": 1.5, "badiya": 1.5, "mast": 1.5,
+    "shukriya": 1.5, "dhanyawad": 1.5, "dhanyavad": 1.5, "khush": 1.5,
+    "sahi": 1, "theek": 0.5, "thik": 0.5, "shandar": 2,
+    # positive (English)
+    "thanks": 1, "thank": 1, "great": 1.5, "good": 1, "nice": 1, "awesome": 2,
+    "excellent": 2, "happy": 1.5, "perfect": 2, "helpful": 1.5, "love": 1.5,
+    "amazing": 2, "resolved": 1,
+}
+
+# Multi-word phrases scored before single words
+SENTIMENT_PHRASES = {
+    "not working": -1.5, "nahi chal raha": -1.5, "kaam nahi": -1.5,
+    "paisa kat": -1.5, "bahut late": -1.5, "thank you": 1.5,
+}
+
+NEGATORS = {"not", "no", "never", "nahi", "nahin", "na", "mat", "dont", "don't"}
+INTENSIFIERS = {"bahut", "bohot", "bohat", "very", "really", "too", "itna", "ekdum", "bilkul", "extremely", "so"}
+
+
+class LexiconSentiment:
+    """
+    Rule-based Hinglish scorer. Handles negation both before the word
+    ("not good") and after it ("accha nahi"), plus intensifiers.
+    """
+
+    name = "lexicon"
+
+    def __init__(self, lexicon=SENTIMENT_LEXICON, phrases=SENTIMENT_PHRASES, alpha=4.0):
+        self.lexicon = lexicon
+        self.phrases = phrases
+        self.alpha = alpha
+
+    def score(self, text, embedding=None):
+        text = text.lower()
+        total = 0.0
+        for phrase, value in self.phrases.items():
+            if phrase in text:
+                total += value
+                text = text.replace(phrase, " ")
+
+        tokens = re.findall(r"[a-z']+", text)
+        for i, token in enumerate(tokens):
+            value = self.lexicon.get(token)
+            if value is None:
+                continue
+            before = tokens[max(0, i - 2):i]
+            if any(t in INTENSIFIERS for t in before):
+                value *= 1.5
+            if any(t in NEGATORS for t in before) or tokens[i + 1:i + 2] and tokens[i + 1] in NEGATORS:
+                value = -value * 0.75
+            total += value
+
+        # Squash the raw sum into (-1, 1)
+        return total / np.sqrt(total * total + self.alpha)
+
+
+# Anchor utterances for the embedding head
+POSITIVE_ANCHORS = [
+    "thank you so much", "this is great, very helpful", "bahut accha service hai",
+    "shukriya, problem solve ho gaya", "I am happy with the service", "badhiya",
+]
+NEGATIVE_ANCHORS = [
+    "this is terrible", "worst service ever", "bahut bakwas service hai",
+    "I am very angry", "mera paisa kat gaya, fraud hai", "kuch kaam nahi kar raha",
+]
+
+
+class EmbeddingSentiment:
+    """
+    Nearest-anchor head on the intent classifier's MiniLM embeddings.
+    Reuses the classifier's utterance cache, so a query that was already
+    classified is not encoded a second time.
+    """
+
+    name = "embedding"
+
+    def __init__(self, classifier, scale=3.0):
+        self.classifier = classifier
+        self.scale = scale
+        self.positive = None
+        self.negative = None
+
+    def load(self):
+        """Embed the anchors (loading the classifier's model if needed)."""
+        if self.negative is None:
+            self.positive = self.classifier.embed(POSITIVE_ANCHORS)
+            self.negative = self.classifier.embed(NEGATIVE_ANCHORS)
+
+    def score(self, text, embedding=None):
+        self.load()
+        if embedding is None:
+            embedding = self.classifier.embed([text])[0]
+        diff = float((self.positive @ embedding).max() - (self.negative @ embedding).max())
+        return float(np.clip(diff * self.scale, -1.0, 1.0))
+
+
+class GroqSentiment:
+    """
+    Asks the Groq LLM for a score. One full chat completion per call,
+    so this is opt-in only.
+    """
+
+    name = "groq"
+
+    def __init__(self, model="llama-3.3-70b-versatile"):
+        self.model = model
+
+    def score(self, text, embedding=None):
+        reply = llm_client.complete(
+            [{"role": "user", "content": f"Rate sentiment of: '{text}' on scale -1 (negative) to 1 (positive). Reply only with number."}],
+            model=self.model,
+            max_tokens=5
+        )
+        try:
+            return float(reply.strip())
+        except (AttributeError, TypeError, ValueError):
+            return 0
+
+
+def get_sentiment_backend(name=None, classifier=None):
+    """
+    Build the sentiment backend named by `name` or SENTIMENT_BACKEND
+    ("lexicon" by default, "embedding" or "groq").
+    """
+    name = (name or os.getenv("SENTIMENT_BACKEND", "lexicon")).lower()
+    if name == "lexicon":
+        return LexiconSentiment()
+    if name == "embedding":
+        if classifier is None:
+            raise ValueError("embedding sentiment backend needs the intent classifier")
+        return EmbeddingSentiment(classifier)
+    if name == "groq":
+        return GroqSentiment()
+    raise ValueError(f"Unknown sentiment backend: {name}")
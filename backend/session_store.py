@@ -0,0 +1,306 @@
+"""
+Per-session conversation state (chat history, sentiment scores) with
+bounded histories, idle expiry and LRU eviction.
+
+Each session holds named lists ("messages", "scores") that keep only their
+newest `limit` items. Backends:
+
+  memory  in-process, deque-backed; idle TTL, max sessions and an
+          approximate byte cap, evicting least recently used sessions
+  sqlite  one file shared by every worker process on the host
+  redis   any Redis-compatible server (Redis, Valkey, KeyDB...) shared
+          across hosts; idle TTL via key expiry, memory via the server's
+          maxmemory + allkeys-lru policy
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dotenv import load_dotenv
+load_dotenv()
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Rough per-item bookkeeping cost on top of the payload
+_ITEM_OVERHEAD = 120
+
+
+def _item_size(item):
+    if isinstance(item, dict):
+        return _ITEM_OVERHEAD + sum(sys.getsizeof(v) for v in item.values())
+    return _ITEM_OVERHEAD
+
+
+class _Session:
+    __slots__ = ("lists", "last_used", "bytes")
+
+    def __init__(self, now):
+        self.lists = {}
+        self.last_used = now
+        self.bytes = 0
+
+
+class MemorySessionStore:
+    """In-process store; sessions are kept in least-recently-used order."""
+
+    name = "memory"
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=SESSION_MAX_SESSIONS, max_bytes=SESSION_MAX_BYTES):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def append(self, session_id, kind, item, limit):
+        now = time.monotonic()
+        size = _item_size(item)
+        with self._lock:
+            session = self._touch(session_id, now)
+            if session is None:
+                session = self._sessions[session_id] = _Session(now)
+
+            items = session.lists.get(kind)
+            if items is None or items.maxlen != limit:
+                items = session.lists[kind] = deque(items or (), maxlen=limit)
+            if len(items) == limit:
+                dropped = _item_size(items[0])
+                session.bytes -= dropped
+                self.bytes -= dropped
+            items.append(item)
+            session.bytes += size
+            self.bytes += size
+            self._evict(now)
+
+    def items(self, session_id, kind):
+        with self._lock:
+            session = self._touch(session_id, time.monotonic())
+            if session is None or kind not in session.lists:
+                return []
+            return list(session.lists[kind])
+
+    def delete(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self.bytes -= session.bytes
+
+    def _touch(self, session_id, now):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if self.ttl and now - session.last_used > self.ttl:
+            del self._sessions[session_id]
+            self.bytes -= session.bytes
+            self.expired += 1
+            return None
+        session.last_used = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _evict(self, now):
+        # Oldest-used sessions sit at the front: drop idle ones, then trim
+        # to the session and byte caps (never the one just written)
+        while len(self._sessions) > 1:
+            session_id, session = next(iter(self._sessions.items()))
+            if self.ttl and now - session.last_used > self.ttl:
+                self.expired += 1
+            elif len(self._sessions) > self.max_sessions or self.bytes > self.max_bytes:
+                self.evicted += 1
+            else:
+                break
+            del self._sessions[session_id]
+            self.bytes -= session.bytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.name,
+                "sessions": len(self._sessions),
+                "bytes": self.bytes,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes
+            }
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite file (WAL mode), so several worker processes on
+    one host see the same conversations. Idle and over-cap sessions are
+    purged at most every `purge_interval` seconds.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=None, ttl=SESSION_TTL, max_sessions=SESSION_MAX_SESSIONS, purge_interval=30):
+        self.path = path or os.getenv("SESSION_SQLITE_PATH", "sessions.db")
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purge = 0.0
+        os.register_at_fork(after_in_child=self._after_fork)
+
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, last_used REAL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_items ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, kind TEXT, data TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS session_items_lookup ON session_items (session_id, kind, seq)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions (last_used)")
+
+    def _after_fork(self):
+        self._local = threading.local()
+
+    def _conn(self):
+        # sqlite3 connections are per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+        return conn
+
+    def append(self, session_id, kind, item, limit):
+        now = time.time()
+        with self._conn() as conn:
+            # Write lock up front, so the expiry check and the upsert see
+            # the same last_used even with other workers writing
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT last_used FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is not None and self.ttl and now - row[0] > self.ttl:
+                # Expired but not purged yet: start the session over
+                conn.execute("DELETE FROM session_items WHERE session_id = ?", (session_id,))
+            conn.execute(
+                "INSERT INTO sessions (id, last_used) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET last_used = excluded.last_used",
+                (session_id, now)
+            )
+            conn.execute(
+                "INSERT INTO session_items (session_id, kind, data) VALUES (?, ?, ?)",
+                (session_id, kind, json.dumps(item))
+            )
+            conn.execute(
+                "DELETE FROM session_items WHERE session_id = ? AND kind = ? AND seq NOT IN "
+                "(SELECT seq FROM session_items WHERE session_id = ? AND kind = ? ORDER BY seq DESC LIMIT ?)",
+                (session_id, kind, session_id, kind, limit)
+            )
+        if now - self._last_purge > self.purge_interval:
+            self._last_purge = now
+            self.purge()
+
+    def items(self, session_id, kind):
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute("SELECT last_used FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None or (self.ttl and now - row[0] > self.ttl):
+                return []
+            conn.execute("UPDATE sessions SET last_used = ? WHERE id = ?", (now, session_id))
+            rows = conn.execute(
+                "SELECT data FROM session_items WHERE session_id = ? AND kind = ? ORDER BY seq",
+                (session_id, kind)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def delete(self, session_id):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM session_items WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def purge(self):
+        """Drop idle sessions, then the least recently used beyond max_sessions."""
+        with self._conn() as conn:
+            if self.ttl:
+                conn.execute("DELETE FROM sessions WHERE last_used < ?", (time.time() - self.ttl,))
+            conn.execute(
+                "DELETE FROM sessions WHERE id IN "
+                "(SELECT id FROM sessions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+            conn.execute("DELETE FROM session_items WHERE session_id NOT IN (SELECT id FROM sessions)")
+
+    def stats(self):
+        with self._conn() as conn:
+            sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            items = conn.execute("SELECT COUNT(*) FROM session_items").fetchone()[0]
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "sessions": sessions,
+            "items": items,
+            "max_sessions": self.max_sessions
+        }
+
+
+class RedisSessionStore:
+    """
+    One Redis list per session and kind, trimmed on every append and
+    expiring after `ttl` idle seconds.
+    """
+
+    name = "redis"
+
+    def __init__(self, url=None, ttl=SESSION_TTL, prefix="session"):
+        import redis
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.ttl = int(ttl) if ttl else None
+        self.prefix = prefix
+
+    def _key(self, session_id, kind):
+        return f"{self.prefix}:{session_id}:{kind}"
+
+    def append(self, session_id, kind, item, limit):
+        key = self._key(session_id, kind)
+        pipe = self.client.pipeline()
+        pipe.rpush(key, json.dumps(item))
+        pipe.ltrim(key, -limit, -1)
+        if self.ttl:
+            pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def items(self, session_id, kind):
+        key = self._key(session_id, kind)
+        pipe = self.client.pipeline()
+        pipe.lrange(key, 0, -1)
+        if self.ttl:
+            pipe.expire(key, self.ttl)
+        return [json.loads(data) for data in pipe.execute()[0]]
+
+    def delete(self, session_id):
+        keys = list(self.client.scan_iter(f"{self.prefix}:{session_id}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        info = self.client.info("memory")
+        return {
+            "backend": self.name,
+            "used_memory": info.get("used_memory"),
+            "maxmemory": info.get("maxmemory"),
+            "maxmemory_policy": info.get("maxmemory_policy")
+        }
+
+
+def create_session_store(backend=None):
+    """
+    Build the store named by `backend` or SESSION_BACKEND
+    ("memory" by default, "sqlite" or "redis").
+    """
+    backend = (backend or os.getenv("SESSION_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    raise ValueError(f"Unknown session backend: {backend}")
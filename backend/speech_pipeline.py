@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Token-to-speech streaming: split LLM output into sentences/clauses as the
+tokens arrive and synthesize each piece while the LLM keeps generating.
+"""
+import queue
+import re
+import threading
+import time
+
+# Sentence ends always flush; clause breaks flush once the chunk is long
+# enough to sound natural on its own
+SENTENCE_END = re.compile(r"[.!?।]+[\"')\]]*\s")
+CLAUSE_END = re.compile(r"[,;:—-]\s")
+
+_DONE = object()
+
+
+class SentenceChunker:
+    """Accumulates tokens and returns speakable chunks at boundaries."""
+
+    def __init__(self, min_clause_chars=40, max_chars=200):
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, token):
+        self.buffer += token
+        chunks = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk, self.buffer = self.buffer[:cut].strip(), self.buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def flush(self):
+        chunk, self.buffer = self.buffer.strip(), ""
+        return [chunk] if chunk else []
+
+    def _find_cut(self):
+        match = SENTENCE_END.search(self.buffer)
+        if match:
+            return match.end()
+        if len(self.buffer) >= self.min_clause_chars:
+            matches = list(CLAUSE_END.finditer(self.buffer))
+            if matches:
+                return matches[-1].end()
+        if len(self.buffer) >= self.max_chars:
+            # No boundary at all: cut on the last space
+            space = self.buffer.rfind(" ", 0, self.max_chars)
+            return space + 1 if space > 0 else self.max_chars
+        return None
+
+
+def split_text(tokens, chunker=None):
+    """Yield speakable chunks from an iterable of text tokens."""
+    chunker = chunker or SentenceChunker()
+    for token in tokens:
+        yield from chunker.feed(token)
+    yield from chunker.flush()
+
+
+def stream_speech(tokens, synthesize, chunker=None, max_pending=4):
+    """
+    Run the LLM token stream and TTS concurrently.
+
+    tokens:     iterable of text deltas (e.g. llm_client.stream_complete)
+    synthesize: callable(text) -> iterable of audio byte chunks
+
+    Yields (seq, text, audio_bytes) for every audio chunk as soon as TTS
+    produces it. Text is given with the first audio chunk of each piece and
+    is "" for the rest of that piece.
+    """
+    pending = queue.Queue(maxsize=max_pending)
+    stopped = threading.Event()
+    errors = []
+
+    def put(item):
+        # Wait for room, but give up once the consumer has gone away
+        while not stopped.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for chunk in split_text(tokens, chunker):
+                if not put(chunk):
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            put(_DONE)
+            # Stops the LLM stream (and its HTTP response) early
+            close = getattr(tokens, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="speech-producer", daemon=True)
+    producer.start()
+
+    seq = 0
+    try:
+        while True:
+            chunk = pending.get()
+            if chunk is _DONE:
+                break
+            text = chunk
+            for audio in synthesize(chunk):
+                if not audio:
+                    continue
+                yield seq, text, audio
+                seq += 1
+                text = ""
+    finally:
+        # Also reached when synthesize raises or the caller stops early
+        stopped.set()
+
+    producer.join()
+    if errors:
+        raise errors[0]
+
+
+if __name__ == "__main__":
+    # Fake LLM and TTS on timers to show time-to-first-audio
+    def fake_llm(text, delay=0.03):
+        for word in text.split(" "):
+            time.sleep(delay)
+            yield word + " "
+
+    def fake_tts(text, delay=0.2):
+        time.sleep(delay)
+        yield text.encode()
+
+    reply = "Aapke paas 5 swaps hain. Total payable amount 750 rupees hai, jo aap app se pay kar sakte hain! Aur kuch madad chahiye?"
+
+    start = time.perf_counter()
+    for seq, text, audio in stream_speech(fake_llm(reply), fake_tts):
+        print(f"{(time.perf_counter() - start) * 1000:7.1f} ms  #{seq} {text!r}")
+
+    start = time.perf_counter()
+    full = "".join(fake_llm(reply))
+    b"".join(fake_tts(full))
+    print(f"{(time.perf_counter() - start) * 1000:7.1f} ms  sequential, first (and only) audio")
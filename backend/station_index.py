@@ -0,0 +1,90 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# Below this many stations a vectorized scan beats building/querying a tree
+BRUTE_FORCE_MAX = 2048
+
+
+def haversine_vec(lat, lon, lats, lons):
+    """
+    Vectorized haversine distance in KM from one point to arrays of points
+    """
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+
+    a = np.sin((lats - lat) / 2) ** 2 + \
+        np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _to_unit_xyz(lats, lons):
+    lats, lons = np.radians(lats), np.radians(lons)
+    cos_lat = np.cos(lats)
+    return np.column_stack((cos_lat * np.cos(lons), cos_lat * np.sin(lons), np.sin(lats)))
+
+
+def _km_to_chord(km):
+    # Straight-line distance on the unit sphere for a great-circle distance
+    return 2 * np.sin(np.minimum(km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class StationIndex:
+    """
+    Nearest-neighbour index over station coordinates.
+
+    Small sets are scanned with a vectorized haversine. Large sets are put in a
+    k-d tree over unit-sphere xyz points, where straight-line distance orders
+    the same way as great-circle distance, then re-scored with haversine.
+    """
+
+    def __init__(self, lats, lons, brute_force_max=BRUTE_FORCE_MAX):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.size = len(self.lats)
+        self.tree = None
+        if self.size > brute_force_max:
+            # scipy is imported only when a tree is worth building
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:  # scipy is optional, brute force works for every size
+                cKDTree = None
+            if cKDTree is not None:
+                self.tree = cKDTree(_to_unit_xyz(self.lats, self.lons))
+
+    def nearest(self, lat, lon, k=1, radius_km=None):
+        """
+        Return up to k (position, distance_km) pairs sorted by distance,
+        optionally limited to stations within radius_km.
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return []
+
+        if self.tree is None:
+            dist = haversine_vec(lat, lon, self.lats, self.lons)
+            # Partition out the k nearest in O(n) instead of sorting every
+            # station; rows tied with the k-th are kept so the stable sort
+            # still puts the lowest row first, like the old row scan
+            if k < self.size:
+                kth = dist[np.argpartition(dist, k - 1)[k - 1]]
+                pos = np.flatnonzero(dist <= kth)
+            else:
+                pos = np.arange(self.size)
+            pos = pos[np.argsort(dist[pos], kind="stable")][:k]
+            dist = dist[pos]
+        else:
+            upper = np.inf if radius_km is None else _km_to_chord(radius_km) * (1 + 1e-9)
+            _, pos = self.tree.query(_to_unit_xyz([lat], [lon])[0], k=k, distance_upper_bound=upper)
+            pos = np.atleast_1d(pos)
+            pos = pos[pos < self.size]
+            dist = haversine_vec(lat, lon, self.lats[pos], self.lons[pos])
+
+        if radius_km is not None:
+            keep = dist <= radius_km
+            pos, dist = pos[keep], dist[keep]
+
+        order = np.argsort(dist, kind="stable")
+        return [(int(p), float(d)) for p, d in zip(pos[order], dist[order])]
+
@@ -1,16 +1,10 @@
-import pandas as pd
-
-FILE_PATH = "mock_invoice_dataset_fixed_dates.xlsx"
+from driver_store import get_driver
 
 def get_subscription_details(driver_id: str) -> str:
-    df = pd.read_excel(FILE_PATH)
-
-    data = df[df["driver_id"] == driver_id]
-    if data.empty:
+    row = get_driver(driver_id)
+    if row is None:
         return f"No subscription found for driver {driver_id}."
 
-    row = data.iloc[0]
-
     return (
         f"Subscription Details for Driver {driver_id}:\n"
         f"- Plan: {row['subscription_plan']}\n"
@@ -1,16 +1,10 @@
-import pandas as pd
-
-FILE_PATH = "mock_invoice_dataset_fixed_dates.xlsx"
+from driver_store import get_driver
 
 def get_swap_invoice_summary(driver_id: str) -> str:
-    df = pd.read_excel(FILE_PATH)
-
-    data = df[df["driver_id"] == driver_id]
-    if data.empty:
+    row = get_driver(driver_id)
+    if row is None:
         return f"No swap or invoice data found for driver {driver_id}."
 
-    row = data.iloc[0]
-
     total_swaps = row["N_b"] + row["N_s"]
     swap_cost = (row["N_b"] * row["P_b"]) + (row["N_s"] * row["P_s"])
     service_charge = total_swaps * row["SC"]
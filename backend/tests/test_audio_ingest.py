@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from audio_ingest import prepare_pcm
+
+
+def tone(n, channels=1):
+    t = np.arange(n) / 16000
+    mono = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+    return np.repeat(mono[:, None], channels, axis=1).reshape(-1)
+
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_prepare_pcm_keeps_every_sample(as_array):
+    samples = tone(16000)
+    pcm = samples if as_array else samples.tobytes()
+    out, rate = prepare_pcm(pcm, 16000)
+    assert rate == 16000
+    assert np.array_equal(np.frombuffer(out, dtype=np.int16), samples)
+
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_prepare_pcm_downmixes_stereo(as_array):
+    samples = tone(8000, channels=2)
+    pcm = samples if as_array else samples.tobytes()
+    out, _ = prepare_pcm(pcm, 16000, channels=2)
+    assert len(out) == 2 * 8000
+
+
+def test_prepare_pcm_drops_a_partial_frame():
+    out, _ = prepare_pcm(tone(100).tobytes() + b"\x01", 16000)
+    assert len(out) == 200
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+import data_cache
+
+
+def test_cache_round_trip_keeps_numeric_columns_mapped(tmp_path, monkeypatch):
+    source = tmp_path / "drivers.xlsx"
+    source.write_bytes(b"stand-in for the Excel file")
+    df = pd.DataFrame({
+        "driver_id": ["D1", "D2", "D3"],
+        "swaps": [3, 0, 7],
+        "amount": [750.0, 0.0, 1250.5],
+        "balance": [1.5, 2.5, 3.5],
+        "station": ["Okhla", None, "Noida"],
+    })
+    gen_dir = data_cache.write_cache(df, str(source))
+
+    mapped = {}
+    load = np.load
+
+    def recording_load(path, *args, **kwargs):
+        values = load(path, *args, **kwargs)
+        mapped[str(path)] = values
+        return values
+
+    monkeypatch.setattr(np, "load", recording_load)
+    cached = data_cache.read_cache(gen_dir)
+
+    assert cached["driver_id"].tolist() == ["D1", "D2", "D3"]
+    assert cached["station"].isna().tolist() == [False, True, False]
+    assert cached["station"][2] == "Noida"
+    for name in ("swaps", "amount", "balance"):
+        assert cached[name].dtype == df[name].dtype
+        assert cached[name].tolist() == df[name].tolist()
+    # Numeric columns must still be views of their memory maps, not copies,
+    # also after lookups that used to consolidate blocks in place (pandas 1.x)
+    cached[cached["swaps"] > 0][["amount", "balance"]].sum()
+    for i, name in enumerate(df.columns):
+        if name in ("swaps", "amount", "balance"):
+            values = mapped[f"{gen_dir}/col{i}.npy"]
+            assert isinstance(values, np.memmap)
+            assert np.shares_memory(cached[name].to_numpy(), values)
+
+
+def test_mixed_object_columns_keep_their_types(tmp_path):
+    source = tmp_path / "drivers.xlsx"
+    source.write_bytes(b"stand-in for the Excel file")
+    df = pd.DataFrame({
+        "driver_id": ["D1", "D2", "D3"],
+        "last_swap": [pd.Timestamp("2024-05-01"), "pending", None],
+        "plan": [499, "custom", 999.5],
+    })
+    cached = data_cache.read_cache(data_cache.write_cache(df, str(source)))
+
+    for name in ("last_swap", "plan"):
+        assert [type(v) for v in cached[name]] == [type(v) for v in df[name]]
+        assert cached[name].tolist() == df[name].tolist()
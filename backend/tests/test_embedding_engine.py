@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import embedding_engine
+
+
+class FakeEmbedder:
+    """Stand-in backend: the fp32 reference plus `drift` times fixed noise."""
+
+    drift = 0.0
+
+    def __init__(self, model_name, threads, quantize=False):
+        self.name = f"{self.kind}-int8" if quantize else self.kind
+        self.threads = threads
+        rng = np.random.default_rng(0)
+        self.reference = rng.standard_normal((len(embedding_engine.PROBE_SENTENCES), 16))
+        self.noise = rng.standard_normal(self.reference.shape)
+        self.min_cosine = 1.0
+        if self.name != "torch":
+            self.min_cosine = embedding_engine._check_tolerance(
+                self.name, self.reference, self.encode(embedding_engine.PROBE_SENTENCES)
+            )
+
+    def encode(self, texts):
+        return self.reference[:len(texts)] + self.drift * self.noise[:len(texts)]
+
+
+class FakeTorch(FakeEmbedder):
+    kind = "torch"
+
+
+class FakeONNX(FakeEmbedder):
+    kind = "onnx"
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    monkeypatch.setattr(embedding_engine, "TorchEmbedder", FakeTorch)
+    monkeypatch.setattr(embedding_engine, "ONNXEmbedder", FakeONNX)
+    monkeypatch.setattr(embedding_engine, "EMBED_TOLERANCE", 0.99)
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8", "torch-int8"])
+def test_drifting_backend_falls_back_to_fp32_torch(fakes, monkeypatch, backend):
+    monkeypatch.setattr(FakeEmbedder, "drift", 0.5)
+    engine = embedding_engine.create_embedding_engine(backend)
+    assert engine.name == "torch"
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8", "torch-int8"])
+def test_backend_within_tolerance_is_kept(fakes, backend):
+    engine = embedding_engine.create_embedding_engine(backend)
+    assert engine.name == backend
+    assert engine.min_cosine >= 0.99
@@ -0,0 +1,8 @@
+import pytest
+
+import check_import_time
+
+
+@pytest.mark.parametrize("module", check_import_time.DEFAULT_MODULES)
+def test_import_stays_within_budget(module):
+    assert check_import_time.check(module, check_import_time.IMPORT_BUDGET_MS, runs=3)
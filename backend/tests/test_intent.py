@@ -0,0 +1,25 @@
+import pytest
+
+from intent import KeywordRouter, find_keywords
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("closest station", "nearest_station"),
+    ("swap history for last weekend", "swap"),
+    ("pending payment invoice", "swap"),
+    ("nearest stations kahan hai", "nearest_station"),
+])
+def test_pass_through_words_only_match_whole_words(query, intent):
+    assert KeywordRouter().route(query)[0] == intent
+
+
+@pytest.mark.parametrize("query", [
+    "transfer me to an agent", "close the chat", "bye", "swap history, then end",
+])
+def test_pass_through_words_still_defer_to_the_classifier(query):
+    assert KeywordRouter().route(query) == (None, 0.0)
+
+
+def test_find_keywords_respects_word_boundaries():
+    assert find_keywords("Spend less, weekend pending") == set()
+    assert find_keywords("Battery swaps history") == {"battery swap", "swap", "history"}
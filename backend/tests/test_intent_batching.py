@@ -0,0 +1,116 @@
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+from app import IntentClassifier, INTENT_EXAMPLES, normalize_utterance
+from batcher import MicroBatcher
+
+DIM = 32
+
+
+class FakeEncoder:
+    """Deterministic stand-in for MiniLM: a fixed random vector per utterance."""
+
+    def __init__(self, overrides=None):
+        self.overrides = overrides or {}
+
+    def vector(self, text):
+        key = normalize_utterance(text)
+        if key in self.overrides:
+            return self.overrides[key]
+        return np.random.default_rng(zlib.crc32(key.encode())).standard_normal(DIM).astype(np.float32)
+
+    def encode(self, texts):
+        return np.stack([self.vector(t) for t in texts])
+
+
+def assert_same_results(actual, expected):
+    # Batched and single matmuls may round the last float bit differently
+    assert [r["intent"] for r in actual] == [r["intent"] for r in expected]
+    assert [r["confidence"] for r in actual] == pytest.approx([r["confidence"] for r in expected], abs=1e-6)
+
+
+def make_classifier(encoder):
+    classifier = IntentClassifier()
+    classifier._model = encoder
+    classifier.example_matrix = classifier._normalize(encoder.encode(classifier.examples))
+    return classifier
+
+
+def reference_classify(text, encoder):
+    """Best example per intent, one intent at a time, first intent wins ties."""
+    query = encoder.vector(text)
+    query = query / np.linalg.norm(query)
+    best_intent, best_score = None, 0
+    for intent, examples in INTENT_EXAMPLES.items():
+        emb = encoder.encode(examples)
+        score = float((emb / np.linalg.norm(emb, axis=1, keepdims=True) @ query).max())
+        if score > best_score:
+            best_intent, best_score = intent, score
+    return best_intent if best_score > 0.5 else "open_talk"
+
+
+@pytest.fixture
+def encoder():
+    intents = list(INTENT_EXAMPLES)
+    first, second = intents[0], intents[1]
+    last, first_next = np.eye(DIM, dtype=np.float32)[:2]
+    # The last example of one intent and the first of the next, plus a query
+    # exactly halfway between them: a tie across a reduceat boundary
+    return FakeEncoder({
+        normalize_utterance(INTENT_EXAMPLES[first][-1]): last,
+        normalize_utterance(INTENT_EXAMPLES[second][0]): first_next,
+        "tie between intents": last + first_next,
+    })
+
+
+def queries():
+    # First and last example of every intent sit on the segment boundaries
+    texts = []
+    for examples in INTENT_EXAMPLES.values():
+        texts += [examples[0], examples[-1].upper() + "  "]
+    return texts + ["tie between intents", "something unrelated", "SWAP history", "swap history"]
+
+
+def test_classify_batch_matches_classify(encoder):
+    texts = queries()
+    batched = make_classifier(encoder).classify_batch(texts)
+    single_classifier = make_classifier(encoder)
+    single = [single_classifier.classify(t) for t in texts]
+
+    assert_same_results(batched, single)
+    assert [r["intent"] for r in batched] == [reference_classify(t, encoder) for t in texts]
+    for examples, intent in zip(INTENT_EXAMPLES.values(), INTENT_EXAMPLES):
+        assert single_classifier.classify(examples[0])["intent"] == intent
+        assert single_classifier.classify(examples[-1])["intent"] == intent
+    assert single_classifier.classify("tie between intents")["intent"] == list(INTENT_EXAMPLES)[0]
+
+
+def test_micro_batcher_returns_each_caller_its_own_result(encoder):
+    classifier = make_classifier(encoder)
+    expected = {t: make_classifier(encoder).classify(t) for t in queries()}
+    batches = []
+
+    def classify_batch(texts):
+        batches.append(len(texts))
+        return classifier.classify_batch(texts)
+
+    batcher = MicroBatcher(classify_batch, max_batch=8, max_wait_ms=20)
+    results = {}
+    start = threading.Barrier(len(expected))
+
+    def call(text):
+        start.wait()
+        results[text] = batcher(text, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(t,)) for t in expected]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_same_results([results[t] for t in expected], list(expected.values()))
+    assert max(batches) > 1
+    assert sum(batches) == len(expected)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import llm_client
+
+TOKENS = ["Namaste", " bhai", "!"]
+
+
+class GroqStub(BaseHTTPRequestHandler):
+    """OpenAI-style chat completions endpoint that records its callers."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.server.requests.append(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if body.get("stream"):
+            events = [
+                {"id": "x", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                 "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                for token in TOKENS
+            ]
+            out = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+            content_type = "text/event-stream"
+        else:
+            out = json.dumps({
+                "id": "x", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(TOKENS)}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 3, "total_tokens": 4}
+            })
+            content_type = "application/json"
+        out = out.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GroqStub)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "GROQ_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    llm_client._reset_after_fork()
+    yield server
+    llm_client._reset_after_fork()
+    server.shutdown()
+    server.server_close()
+
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def test_complete_reuses_one_connection(stub):
+    replies = [llm_client.complete(MESSAGES) for _ in range(3)]
+    assert replies == ["Namaste bhai!"] * 3
+    assert len(stub.requests) == 3
+    assert len(set(stub.requests)) == 1
+
+
+def test_stream_complete(stub):
+    assert list(llm_client.stream_complete(MESSAGES)) == TOKENS
+    client = llm_client.get_client()
+    assert list(llm_client.stream_complete(MESSAGES)) == TOKENS
+    assert llm_client.get_client() is client
+    assert len(set(stub.requests)) == 1
+
+
+def test_async_variants_share_one_client(stub):
+    async def run():
+        reply = await llm_client.acomplete(MESSAGES)
+        client = llm_client.get_async_client()
+        tokens = [token async for token in llm_client.astream_complete(MESSAGES)]
+        assert llm_client.get_async_client() is client
+        await client.close()
+        return reply, tokens
+
+    reply, tokens = asyncio.run(run())
+    assert reply == "Namaste bhai!"
+    assert tokens == TOKENS
+    assert len(stub.requests) == 2
+    assert len(set(stub.requests)) == 1
+
+
+def test_client_is_replaced_after_fork(stub):
+    parent_client = llm_client.get_client()
+    llm_client.complete(MESSAGES)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fresh = llm_client._client is None
+            reply = llm_client.complete(MESSAGES)
+            ok = fresh and llm_client.get_client() is not parent_client and reply == "Namaste bhai!"
+            os.write(write_fd, b"ok" if ok else b"fail")
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    result = os.read(read_fd, 16)
+    os.waitpid(pid, 0)
+    os.close(read_fd)
+
+    assert result == b"ok"
+    assert llm_client.get_client() is parent_client
+    # The child opened its own connection instead of using the parent's socket
+    assert len(stub.requests) == 2
+    assert len(set(stub.requests)) == 2
@@ -0,0 +1,58 @@
+import pytest
+
+import session_store
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemorySessionStore(ttl=60)
+    return SQLiteSessionStore(path=str(tmp_path / "sessions.db"), ttl=60)
+
+
+def test_append_keeps_the_latest_items(store):
+    for i in range(5):
+        store.append("driver-1", "messages", {"n": i}, limit=3)
+    store.append("driver-2", "messages", {"n": 9}, limit=3)
+    assert store.items("driver-1", "messages") == [{"n": 2}, {"n": 3}, {"n": 4}]
+    assert store.items("driver-1", "scores") == []
+    store.delete("driver-1")
+    assert store.items("driver-1", "messages") == []
+    assert store.items("driver-2", "messages") == [{"n": 9}]
+
+
+def test_expired_session_is_not_revived_by_append(store, clock):
+    store.append("driver-1", "messages", {"n": 1}, limit=10)
+    store.append("driver-1", "scores", 0.5, limit=10)
+    clock.now += 61
+    store.append("driver-1", "messages", {"n": 2}, limit=10)
+    assert store.items("driver-1", "messages") == [{"n": 2}]
+    assert store.items("driver-1", "scores") == []
+
+
+def test_session_used_within_ttl_stays(store, clock):
+    store.append("driver-1", "messages", {"n": 1}, limit=10)
+    clock.now += 40
+    assert store.items("driver-1", "messages") == [{"n": 1}]
+    clock.now += 40
+    store.append("driver-1", "messages", {"n": 2}, limit=10)
+    assert store.items("driver-1", "messages") == [{"n": 1}, {"n": 2}]
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from speech_pipeline import stream_speech
+
+
+def endless_tokens(closed):
+    try:
+        while True:
+            yield "Ek aur sentence. "
+    finally:
+        closed.set()
+
+
+def wait_for_producer_exit(timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not any(t.name == "speech-producer" for t in threading.enumerate()):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_producer_exits_when_synthesize_raises():
+    closed = threading.Event()
+
+    def synthesize(text):
+        raise RuntimeError("TTS down")
+
+    with pytest.raises(RuntimeError, match="TTS down"):
+        list(stream_speech(endless_tokens(closed), synthesize, max_pending=1))
+    assert wait_for_producer_exit()
+    assert closed.wait(1)
+
+
+def test_producer_exits_when_consumer_stops_early():
+    closed = threading.Event()
+    speech = stream_speech(endless_tokens(closed), lambda text: [text.encode()], max_pending=1)
+    assert next(speech) == (0, "Ek aur sentence.", b"Ek aur sentence.")
+    speech.close()
+    assert wait_for_producer_exit()
+    assert closed.wait(1)
+
+
+def test_stream_speech_yields_every_piece_in_order():
+    tokens = iter(["Pehla. ", "Doosra! ", "Teesra"])
+    pieces = [(seq, text) for seq, text, _ in stream_speech(tokens, lambda text: [b"a", b"", b"b"])]
+    assert pieces == [(0, "Pehla."), (1, ""), (2, "Doosra!"), (3, ""), (4, "Teesra"), (5, "")]
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from station_index import StationIndex, haversine_vec
+
+
+def stations(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 26.4 + rng.uniform(-0.5, 0.5, n), 80.4 + rng.uniform(-0.5, 0.5, n)
+
+
+@pytest.mark.parametrize("k", [1, 3, 10, 50])
+def test_brute_force_nearest_matches_a_full_sort(k):
+    lats, lons = stations(50)
+    index = StationIndex(lats, lons)
+    dist = haversine_vec(26.42, 80.40, lats, lons)
+    expected = np.argsort(dist, kind="stable")[:k]
+    assert [p for p, _ in index.nearest(26.42, 80.40, k=k)] == expected.tolist()
+
+
+def test_ties_keep_the_lowest_row_first():
+    lats = np.array([26.5, 26.4, 26.3, 26.4, 26.4])
+    lons = np.array([80.5, 80.4, 80.3, 80.4, 80.4])
+    index = StationIndex(lats, lons)
+    assert [p for p, _ in index.nearest(26.4, 80.4, k=1)] == [1]
+    assert [p for p, _ in index.nearest(26.4, 80.4, k=2)] == [1, 3]
+
+
+def test_radius_limits_results():
+    lats, lons = stations(200, seed=1)
+    index = StationIndex(lats, lons)
+    hits = index.nearest(26.42, 80.40, k=200, radius_km=10)
+    assert hits and all(d <= 10 for _, d in hits)
+    assert [d for _, d in hits] == sorted(d for _, d in hits)
@@ -0,0 +1,65 @@
+import os
+
+from tts_cache import TTSCache
+from tts_engine import LocalToneEngine
+
+
+def disk_usage(cache_dir):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(cache_dir) for name in files)
+
+
+def test_overwrites_do_not_inflate_disk_bytes(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path), memory_items=4, disk_max_bytes=10_000)
+    cache.put("first", "voice", "model", b"x" * 100, persist=True)
+    for size in (300, 200, 200):
+        cache.put("second", "voice", "model", b"y" * size, persist=True)
+    assert cache.stats()["disk_bytes"] == disk_usage(tmp_path) == 300
+
+
+def test_eviction_keeps_the_store_under_its_cap(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path), memory_items=4, disk_max_bytes=1000)
+    for i in range(20):
+        cache.put(f"line {i}", "voice", "model", b"z" * 100, persist=True)
+    assert disk_usage(tmp_path) <= 1000
+    assert cache.stats()["disk_bytes"] == disk_usage(tmp_path)
+
+
+def test_wav_entries_round_trip_from_disk(tmp_path):
+    engine = LocalToneEngine(ms_per_char=10)
+    audio = engine.synthesize("namaste")
+    TTSCache(cache_dir=str(tmp_path)).put("namaste", engine.voice_id, engine.model_id, audio, persist=True)
+
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 1 and not files[0].endswith(".mp3")
+    # A fresh cache (new process) finds the entry on disk
+    assert TTSCache(cache_dir=str(tmp_path)).get("namaste", engine.voice_id, engine.model_id) == audio
+
+
+def test_generated_lines_stay_in_memory_until_they_recur(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path), memory_items=8, promote_hits=2)
+
+    def synthesize():
+        yield b"Namaste DRV0001! "
+        yield b"Aapka bill 750 rupees hai."
+
+    text = "Namaste DRV0001! Aapka bill 750 rupees hai."
+    assert b"".join(cache.stream(text, "voice", "model", synthesize)) == b"".join(synthesize())
+    assert disk_usage(tmp_path) == 0
+
+    # One memory hit: still a one-off
+    assert cache.get(text, "voice", "model") is not None
+    assert disk_usage(tmp_path) == 0
+
+    # Second memory hit: a recurring line, written to disk
+    assert cache.get(text, "voice", "model") is not None
+    assert disk_usage(tmp_path) > 0
+    assert cache.stats()["promoted"] == 1
+
+
+def test_prewarmed_lines_go_to_disk(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path), promote_hits=0)
+    cache.prewarm(["Dhanyavaad!"], "voice", "model", lambda text: text.encode())
+    cache.get_or_synthesize("One-off reply", "voice", "model", lambda: b"one-off")
+    assert TTSCache(cache_dir=str(tmp_path)).get("Dhanyavaad!", "voice", "model") == b"Dhanyavaad!"
+    assert TTSCache(cache_dir=str(tmp_path)).get("One-off reply", "voice", "model") is None
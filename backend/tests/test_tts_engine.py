@@ -0,0 +1,36 @@
+import io
+import wave
+
+from tts_engine import LocalToneEngine, wav_stream_piece
+
+
+def test_local_tone_stream_is_a_valid_wav():
+    engine = LocalToneEngine(ms_per_char=10, chunk_ms=50)
+    text = "Aapke paas 5 swaps hain."
+    with wave.open(io.BytesIO(b"".join(engine.stream(text)))) as wav_file:
+        assert wav_file.getnchannels() == 1
+        assert wav_file.getsampwidth() == 2
+        assert wav_file.getframerate() == engine.sample_rate
+        assert wav_file.getnframes() == len(engine._samples(text))
+        assert len(wav_file.readframes(wav_file.getnframes())) == 2 * wav_file.getnframes()
+
+
+def test_wav_stream_pieces_join_into_one_file():
+    engine = LocalToneEngine(ms_per_char=10, chunk_ms=50)
+    sentences = ["Pehla sentence.", "Doosra, thoda lamba sentence.", "Bye!"]
+    audio = b"".join(
+        chunk
+        for i, text in enumerate(sentences)
+        for chunk in wav_stream_piece(engine.stream(text), first=i == 0)
+    )
+    assert audio.count(b"RIFF") == 1
+    with wave.open(io.BytesIO(audio)) as wav_file:
+        frames = wav_file.readframes(1 << 30)
+    expected = b"".join(engine._samples(text).tobytes() for text in sentences)
+    assert frames == expected
+
+
+def test_wav_stream_piece_splits_a_cached_single_chunk():
+    engine = LocalToneEngine(ms_per_char=10)
+    audio = engine.synthesize("cached")
+    assert b"".join(wav_stream_piece([audio], first=False)) == audio[44:]
@@ -1,19 +1,10 @@
 from elevenlabs import stream
-from elevenlabs.client import ElevenLabs
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-API_KEY = os.getenv("ELEVENLABS_API_KEY")
-elevenlabs = ElevenLabs(api_key=API_KEY)
+from tts_engine import get_tts_engine
 
 def speak_text(text):
     try:
-        audio_stream = elevenlabs.text_to_speech.stream(
-            text=text,
-            voice_id="cgSgspJ2msm6clMCkdW9",  # Adam voice (free)
-            model_id="eleven_multilingual_v2"
-        )
+        # Cached audio for repeated lines, live stream from the engine otherwise
+        audio_stream = get_tts_engine().stream(text)
         # play the streamed audio locally
         stream(audio_stream)
     except Exception as e:
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import threading
+from lru_cache import LRUCache
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MEMORY_ITEMS = int(os.getenv("TTS_CACHE_MEMORY_ITEMS", "256"))
+TTS_CACHE_DISK_MAX_BYTES = int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", str(200 * 1024 * 1024)))
+# Memory hits after which a generated line is written to disk (0: never)
+TTS_CACHE_PROMOTE_HITS = int(os.getenv("TTS_CACHE_PROMOTE_HITS", "2"))
+
+# Entries hold whatever the engine produced (MP3, WAV...), so the files get
+# a neutral suffix; ".mp3" entries from older versions are still evicted
+ENTRY_SUFFIX = ".bin"
+LEGACY_SUFFIXES = (".mp3",)
+
+
+def cache_key(text, voice_id, model_id):
+    """Content address for a synthesized utterance."""
+    raw = f"{voice_id}\x00{model_id}\x00{text.strip()}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-tier cache of synthesized audio keyed on (text, voice_id, model_id):
+    an in-memory LRU in front of a size-bounded on-disk store.
+
+    Only prewarmed (fixed) lines and lines that keep recurring go to disk:
+    generated replies stay in the memory tier until they have had
+    `promote_hits` memory hits, so one-off, per-driver sentences (amounts,
+    driver IDs) are never written out.
+    """
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR, memory_items=TTS_CACHE_MEMORY_ITEMS,
+                 disk_max_bytes=TTS_CACHE_DISK_MAX_BYTES, promote_hits=TTS_CACHE_PROMOTE_HITS):
+        self.cache_dir = cache_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.promote_hits = promote_hits
+        self.memory = LRUCache(memory_items)
+        # Memory hits per key, bounded like the memory tier itself
+        self._memory_hits = LRUCache(memory_items * 4)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.promoted = 0
+        self._disk_bytes = None  # computed on first disk write
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, text, voice_id, model_id):
+        key = cache_key(text, voice_id, model_id)
+        audio = self.memory.get(key)
+        if audio is not None:
+            self._count_memory_hit(key, audio)
+            return audio
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # mtime doubles as last-used time for eviction
+        except OSError:
+            with self._lock:
+                self.disk_misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+        self.memory.put(key, audio)
+        return audio
+
+    def _count_memory_hit(self, key, audio):
+        if self.promote_hits <= 0:
+            return
+        with self._lock:
+            hits = self._memory_hits.get(key, 0) + 1
+            self._memory_hits.put(key, hits)
+        if hits == self.promote_hits and self._write(key, audio):
+            with self._lock:
+                self.promoted += 1
+
+    def put(self, text, voice_id, model_id, audio, persist=False):
+        """
+        Cache audio in memory; persist=True (fixed, prewarmed lines) also
+        writes it to disk.
+        """
+        if not audio:
+            return
+        key = cache_key(text, voice_id, model_id)
+        self.memory.put(key, audio)
+        if persist:
+            self._write(key, audio)
+
+    def _write(self, key, audio):
+        path = self._path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[TTS cache write failed: {e}]")
+            return False
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+            else:
+                self._disk_bytes += len(audio) - replaced
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict()
+        return True
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith((ENTRY_SUFFIX,) + LEGACY_SUFFIXES):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_mtime, st.st_size
+
+    def _evict(self):
+        # Oldest-used files go first until the store is back under 90% of the cap
+        entries = sorted(self._disk_entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        target = self.disk_max_bytes * 0.9
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def get_or_synthesize(self, text, voice_id, model_id, synthesize, persist=False):
+        """Return cached audio, or call synthesize() -> bytes and cache it."""
+        audio = self.get(text, voice_id, model_id)
+        if audio is None:
+            audio = synthesize()
+            self.put(text, voice_id, model_id, audio, persist)
+        return audio
+
+    def stream(self, text, voice_id, model_id, synthesize_stream):
+        """
+        Yield audio chunks: the cached audio on a hit, otherwise the chunks
+        from synthesize_stream() as they arrive, caching them once complete.
+        """
+        audio = self.get(text, voice_id, model_id)
+        if audio is not None:
+            yield audio
+            return
+
+        chunks = []
+        for chunk in synthesize_stream():
+            chunks.append(chunk)
+            yield chunk
+        self.put(text, voice_id, model_id, b"".join(chunks))
+
+    def prewarm(self, phrases, voice_id, model_id, synthesize):
+        """Synthesize and store on disk any phrase not cached yet; errors are logged."""
+        for text in phrases:
+            try:
+                self.get_or_synthesize(text, voice_id, model_id, lambda: synthesize(text), persist=True)
+            except Exception as e:
+                print(f"[TTS prewarm failed for {text!r}: {e}]")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory": self.memory.stats(),
+                "disk_hits": self.disk_hits,
+                "disk_misses": self.disk_misses,
+                "promoted": self.promoted,
+                "disk_bytes": self._disk_bytes
+            }
+
+
+# Shared instance for all servers in this process
+tts_cache = TTSCache()
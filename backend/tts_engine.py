@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import struct
+import threading
+import time
+import numpy as np
+from tts_cache import tts_cache
+from dotenv import load_dotenv
+load_dotenv()
+
+DEFAULT_VOICE_ID = "cgSgspJ2msm6clMCkdW9"  # Adam voice (free)
+DEFAULT_MODEL_ID = "eleven_multilingual_v2"
+
+_DONE = object()
+
+WAV_HEADER_BYTES = 44
+# RIFF and data sizes for a WAV stream whose length is not known up front
+_WAV_OPEN_ENDED = 0xFFFFFFFF
+
+
+def wav_header(sample_rate, n_samples):
+    """44-byte RIFF header for n_samples of mono 16-bit PCM."""
+    data_size = 2 * n_samples
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + data_size, b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", data_size
+    )
+
+
+def wav_stream_piece(chunks, first):
+    """
+    Turn one sentence's WAV chunks into a piece of a longer WAV stream:
+    the first piece keeps its header with open-ended sizes, later pieces
+    drop theirs and send only PCM samples, so the pieces joined in order
+    are one playable file.
+    """
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= WAV_HEADER_BYTES:
+            break
+    header, rest = head[:WAV_HEADER_BYTES], head[WAV_HEADER_BYTES:]
+    if first:
+        yield header[:4] + struct.pack("<I", _WAV_OPEN_ENDED) + header[8:40] + \
+            struct.pack("<I", _WAV_OPEN_ENDED - 36)
+    if rest:
+        yield rest
+    yield from chunks
+
+
+class TTSEngine(ABC):
+    """
+    Base text-to-speech engine. Backends implement stream(); sync, async
+    and async-streaming variants are derived from it.
+    """
+
+    content_type = "audio/mpeg"
+    voice_id = None
+    model_id = None
+
+    @abstractmethod
+    def stream(self, text):
+        """Yield audio byte chunks for text as they are produced."""
+
+    def synthesize(self, text):
+        return b"".join(self.stream(text))
+
+    async def asynthesize(self, text):
+        return await asyncio.to_thread(self.synthesize, text)
+
+    async def astream(self, text):
+        # Drive the blocking stream on a worker thread and hand chunks
+        # to the event loop as they arrive
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+
+        def pump():
+            try:
+                for chunk in self.stream(text):
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            except Exception as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, _DONE)
+
+        threading.Thread(target=pump, daemon=True).start()
+        while True:
+            chunk = await chunks.get()
+            if chunk is _DONE:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+class ElevenLabsEngine(TTSEngine):
+    """ElevenLabs streaming TTS (MP3)."""
+
+    content_type = "audio/mpeg"
+
+    def __init__(self, api_key=None, voice_id=DEFAULT_VOICE_ID, model_id=DEFAULT_MODEL_ID):
+        from elevenlabs.client import ElevenLabs
+        self.client = ElevenLabs(api_key=api_key or os.getenv("ELEVENLABS_API_KEY"))
+        self.voice_id = voice_id
+        self.model_id = model_id
+
+    def stream(self, text):
+        return self.client.text_to_speech.stream(
+            text=text,
+            voice_id=self.voice_id,
+            model_id=self.model_id
+        )
+
+
+class LocalToneEngine(TTSEngine):
+    """
+    Offline CPU backend for load tests and benchmarks. Produces a
+    deterministic WAV tone (or silence) whose length follows the text, so
+    no network or model is needed. latency_ms and realtime emulate a real
+    service's first-byte delay and pacing.
+    """
+
+    content_type = "audio/wav"
+    voice_id = "local-tone"
+    model_id = "tone-v1"
+
+    def __init__(self, sample_rate=16000, ms_per_char=60, chunk_ms=200,
+                 silence=False, latency_ms=0, realtime=False):
+        self.sample_rate = sample_rate
+        self.ms_per_char = ms_per_char
+        self.chunk_ms = chunk_ms
+        self.silence = silence
+        self.latency_ms = latency_ms
+        self.realtime = realtime
+
+    def _samples(self, text):
+        n = max(1, int(len(text) * self.ms_per_char * self.sample_rate / 1000))
+        if self.silence:
+            return np.zeros(n, dtype=np.int16)
+        # Pitch derived from the text so different lines sound different
+        freq = 180 + int(hashlib.md5(text.encode("utf-8")).hexdigest()[:4], 16) % 200
+        t = np.arange(n) / self.sample_rate
+        return (np.sin(2 * np.pi * freq * t) * 8000).astype(np.int16)
+
+    def stream(self, text):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        samples = self._samples(text)
+        yield wav_header(self.sample_rate, len(samples))
+
+        step = max(1, int(self.sample_rate * self.chunk_ms / 1000))
+        for i in range(0, len(samples), step):
+            if self.realtime:
+                time.sleep(self.chunk_ms / 1000)
+            yield samples[i:i + step].tobytes()
+
+
+class CachedTTSEngine(TTSEngine):
+    """Puts the shared TTS cache in front of another engine."""
+
+    def __init__(self, engine, cache=tts_cache):
+        self.engine = engine
+        self.cache = cache
+        self.content_type = engine.content_type
+        self.voice_id = engine.voice_id
+        self.model_id = engine.model_id
+
+    def stream(self, text):
+        return self.cache.stream(text, self.voice_id, self.model_id, lambda: self.engine.stream(text))
+
+    def synthesize(self, text):
+        return self.cache.get_or_synthesize(text, self.voice_id, self.model_id, lambda: self.engine.synthesize(text))
+
+    def prewarm(self, phrases):
+        self.cache.prewarm(phrases, self.voice_id, self.model_id, self.engine.synthesize)
+
+
+def create_tts_engine(backend=None, cached=True):
+    """
+    Build the engine named by `backend` or TTS_BACKEND
+    ("elevenlabs" by default, or "local").
+    """
+    backend = (backend or os.getenv("TTS_BACKEND", "elevenlabs")).lower()
+    if backend == "elevenlabs":
+        engine = ElevenLabsEngine()
+    elif backend == "local":
+        engine = LocalToneEngine(
+            latency_ms=float(os.getenv("LOCAL_TTS_LATENCY_MS", "0")),
+            realtime=os.getenv("LOCAL_TTS_REALTIME", "0") == "1"
+        )
+    else:
+        raise ValueError(f"Unknown TTS backend: {backend}")
+    return CachedTTSEngine(engine) if cached else engine
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_tts_engine():
+    """Process-wide TTS engine shared by every server."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_tts_engine()
+    return _engine
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Voice activity detection and endpointing for live 16-bit mono PCM.
+Incoming audio is cut into fixed frames, each frame is classified as
+speech/non-speech, and utterance boundaries are emitted once speech has
+started and the hangover of trailing silence has run out.
+"""
+import os
+from collections import namedtuple
+import numpy as np
+from ring_buffer import PCMRingBuffer
+from dotenv import load_dotenv
+load_dotenv()
+
+SPEECH_START = "start"
+SPEECH = "speech"
+SPEECH_END = "end"
+
+# kind is one of the constants above; audio is an int16 array (empty for
+# SPEECH_END) that views the endpointer's ring buffer, so consume or copy it
+# before the next process() call
+VADEvent = namedtuple("VADEvent", ["kind", "audio"])
+
+
+class EnergyVAD:
+    """
+    Frame energy against an adaptive noise floor. The floor follows quiet
+    frames quickly and loud frames slowly, so steady background noise is
+    not mistaken for speech.
+    """
+
+    name = "energy"
+
+    def __init__(self, margin_db=12.0, min_speech_db=-50.0, floor_db=None,
+                 attack=0.5, release=0.005):
+        self.margin_db = margin_db
+        self.min_speech_db = min_speech_db
+        self.floor_db = floor_db
+        self.attack = attack
+        self.release = release
+
+    @staticmethod
+    def level_db(frame):
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        if not len(samples):
+            return -120.0
+        rms = np.sqrt(np.mean(samples * samples)) / 32768.0
+        return 20 * np.log10(max(rms, 1e-6))
+
+    def is_speech(self, frame, sample_rate):
+        level = self.level_db(frame)
+        if self.floor_db is None:
+            self.floor_db = level  # assume the call opens without speech
+        speech = level > max(self.floor_db + self.margin_db, self.min_speech_db)
+        rate = self.release if level > self.floor_db else self.attack
+        self.floor_db += (level - self.floor_db) * rate
+        return speech
+
+
+class WebRTCVAD:
+    """Google's WebRTC VAD (webrtcvad package); frames must be 10/20/30 ms."""
+
+    name = "webrtc"
+
+    def __init__(self, aggressiveness=2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame, sample_rate):
+        return self.vad.is_speech(bytes(frame), sample_rate)
+
+
+def create_vad(backend=None):
+    """
+    Build the classifier named by `backend` or VAD_BACKEND
+    ("energy" by default, or "webrtc").
+    """
+    backend = (backend or os.getenv("VAD_BACKEND", "energy")).lower()
+    if backend == "energy":
+        return EnergyVAD()
+    if backend == "webrtc":
+        return WebRTCVAD(int(os.getenv("VAD_AGGRESSIVENESS", "2")))
+    raise ValueError(f"Unknown VAD backend: {backend}")
+
+
+class Endpointer:
+    """
+    Turns a stream of PCM into utterance events.
+
+    process(pcm) returns a list of VADEvent:
+      SPEECH_START with the pre-roll audio (including the frames that
+                   triggered it), so the first syllable is not lost
+      SPEECH       with each following frame of the utterance
+      SPEECH_END   after hangover_ms of silence or max_utterance_ms of speech
+
+    Silence outside utterances is dropped. Audio lives in one
+    preallocated ring buffer that the VAD and the event consumers read from
+    directly; it holds the pre-roll plus buffer_ms of unread input.
+    """
+
+    def __init__(self, sample_rate, vad=None, frame_ms=None, start_ms=None,
+                 hangover_ms=None, preroll_ms=None, max_utterance_ms=None, buffer_ms=1000):
+        self.sample_rate = sample_rate
+        self.vad = vad or create_vad()
+        frame_ms = frame_ms or int(os.getenv("VAD_FRAME_MS", "30"))
+        start_ms = start_ms or int(os.getenv("VAD_START_MS", "90"))
+        hangover_ms = hangover_ms or int(os.getenv("VAD_HANGOVER_MS", "600"))
+        preroll_ms = preroll_ms or int(os.getenv("VAD_PREROLL_MS", "300"))
+        max_utterance_ms = max_utterance_ms or int(os.getenv("VAD_MAX_UTTERANCE_MS", "15000"))
+
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.max_frames = max(1, max_utterance_ms // frame_ms)
+        self.preroll_samples = max(self.start_frames, preroll_ms // frame_ms) * self.frame_samples
+        self.ring = PCMRingBuffer(self.preroll_samples + sample_rate * buffer_ms // 1000)
+
+        self.in_speech = False
+        self.voiced = 0     # consecutive speech frames while waiting to start
+        self.silent = 0     # consecutive silent frames inside an utterance
+        self.frames = 0     # frames in the current utterance
+
+    def process(self, pcm):
+        self.ring.write(pcm)
+        events = []
+        while len(self.ring) >= self.frame_samples:
+            events.extend(self._frame(self.ring.read(self.frame_samples)))
+        return events
+
+    def _frame(self, frame):
+        speech = self.vad.is_speech(frame, self.sample_rate)
+
+        if not self.in_speech:
+            self.voiced = self.voiced + 1 if speech else 0
+            if self.voiced < self.start_frames:
+                return []
+            self.in_speech = True
+            self.silent = 0
+            audio = self.ring.history(self.preroll_samples)
+            self.frames = len(audio) // self.frame_samples
+            return [VADEvent(SPEECH_START, audio)]
+
+        self.frames += 1
+        self.silent = 0 if speech else self.silent + 1
+        events = [VADEvent(SPEECH, frame)]
+        if self.silent >= self.hangover_frames or self.frames >= self.max_frames:
+            events.append(self._end())
+        return events
+
+    def _end(self):
+        self.in_speech = False
+        self.voiced = 0
+        self.silent = 0
+        self.frames = 0
+        return VADEvent(SPEECH_END, np.empty(0, dtype=np.int16))
+
+    def flush(self):
+        """Close an open utterance, e.g. when the track ends."""
+        self.ring.clear()
+        return [self._end()] if self.in_speech else []
+
+
+if __name__ == "__main__":
+    # Synthetic call: a short pause inside an utterance, then a real gap
+    rate = 48000
+    rng = np.random.default_rng(0)
+
+    def noise(ms, level=200):
+        return (rng.normal(0, level, rate * ms // 1000)).astype(np.int16)
+
+    def voice(ms):
+        t = np.arange(rate * ms // 1000) / rate
+        return (np.sin(2 * np.pi * 220 * t) * 6000 * (1 + np.sin(2 * np.pi * 4 * t)) / 2).astype(np.int16) + noise(ms)
+
+    audio = np.concatenate([noise(1000), voice(800), noise(250), voice(600), noise(900), voice(700), noise(1500)]).tobytes()
+    endpointer = Endpointer(rate, vad=EnergyVAD())
+    frame = rate // 100 * 2  # 10 ms, as LiveKit delivers it
+    start = None
+    for i in range(0, len(audio), frame):
+        t_ms = i // 2 * 1000 // rate
+        for event in endpointer.process(audio[i:i + frame]):
+            if event.kind == SPEECH_START:
+                start = t_ms - len(event.audio) * 1000 // rate
+                print(f"{t_ms:5d} ms  speech start (pre-roll from {start} ms)")
+            elif event.kind == SPEECH_END:
+                print(f"{t_ms:5d} ms  speech end ({t_ms - start} ms utterance)")
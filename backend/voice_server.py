@@ -1,28 +1,119 @@
+import os
+
+# Green-thread production mode (gunicorn's eventlet worker patches on its
+# own). Patch before anything else creates sockets or locks.
+SOCKETIO_ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE")
+if SOCKETIO_ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+elif SOCKETIO_ASYNC_MODE == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import speech_recognition as sr
 import io
 import wave
-import tempfile
-import os
 import base64
 import json
-from elevenlabs import stream
-from elevenlabs.client import ElevenLabs
+import uuid
+import functools
+from urllib.parse import quote
 from dotenv import load_dotenv
-from app import process_query
+from speech_pipeline import stream_speech, split_text
+from tts_cache import tts_cache
+from tts_engine import get_tts_engine, wav_stream_piece
+from asr_engine import get_asr_engine
+from audio_ingest import to_audio_data, prepare_pcm
+from workers import run_cpu, admission
+from app import process_query, process_query_stream, HANDOFF_RESPONSE, END_CHAT_RESPONSE, intent_batcher, classifier, keyword_router, pipeline_stats, memory, warm_up
 
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+CORS(app, expose_headers=['X-Text-Response', 'X-Text-Input', 'X-Should-End'])
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SOCKETIO_ASYNC_MODE)
+
+# TTS backend (ElevenLabs or local) with the shared cache in front
+tts = get_tts_engine()
+
+# Fixed bot lines, synthesized once at startup. Streamed replies are cached
+# per sentence, so the split pieces are warmed as well.
+WELCOME_SENTENCES = ["Main SachAI hoon.", "Aapki kaise madad kar sakta hoon today?"]
+PREWARM_PHRASES = WELCOME_SENTENCES + [HANDOFF_RESPONSE, END_CHAT_RESPONSE]
+
+def synthesize_sentence(text):
+    # One complete clip per sentence so the browser can play each on its own
+    return [tts.synthesize(text)]
 
-# Initialize ElevenLabs
-elevenlabs = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+def recognize(audio):
+    """Speech to text for an sr.AudioData; local engines run on the CPU pool."""
+    asr = get_asr_engine()
+    if asr.cpu_bound:
+        return run_cpu(asr.transcribe_audio, audio)
+    return asr.transcribe_audio(audio)
+
+def prewarm_tts():
+    phrases = list(PREWARM_PHRASES)
+    for phrase in PREWARM_PHRASES:
+        phrases.extend(split_text([phrase]))
+    tts.prewarm(dict.fromkeys(phrases))
+
+def admitted(view):
+    """
+    Run an HTTP view under admission control. The slot is held until the
+    response is closed, so a streamed audio body keeps it while it is sent.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not admission.acquire():
+            return jsonify({'error': 'Server busy, please try again'}), 503
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        except Exception:
+            admission.release()
+            raise
+        response.call_on_close(admission.release)
+        return response
+    return wrapper
+
+def wants_audio_body():
+    """True when the client prefers the audio itself (Accept: audio/*) over JSON."""
+    return request.accept_mimetypes.best_match(['application/json', tts.content_type]) == tts.content_type
+
+def chat_reply(response_text, should_end, text_input=None):
+    """
+    Reply for the HTTP chat endpoints. By default JSON with the audio as
+    hex. Clients that accept audio/* get the TTS audio as the response
+    body, streamed from the engine as it is synthesized, with the text in
+    X-* headers (percent-encoded UTF-8).
+    """
+    if wants_audio_body():
+        headers = {
+            'X-Text-Response': quote(response_text),
+            'X-Should-End': 'true' if should_end else 'false',
+            'Cache-Control': 'no-store'
+        }
+        if text_input is not None:
+            headers['X-Text-Input'] = quote(text_input)
+        return Response(tts.stream(response_text), mimetype=tts.content_type, headers=headers)
+    
+    # Generate audio response
+    audio_bytes = tts.synthesize(response_text)
+    
+    reply = {
+        'text_response': response_text,
+        'audio_response': audio_bytes.hex(),  # Convert to hex for JSON transport
+        'should_end': should_end
+    }
+    if text_input is not None:
+        reply['text_input'] = text_input
+    return jsonify(reply)
 
 @app.route('/voice-chat', methods=['POST'])
+@admitted
 def voice_chat():
     try:
         # Get audio data and user info from request
@@ -33,50 +124,29 @@ def voice_chat():
         if not audio_data:
             return jsonify({'error': 'No audio data provided'}), 400
         
-        # Convert audio to text using speech recognition
-        recognizer = sr.Recognizer()
+        # Decode the upload in memory and convert audio to text
+        try:
+            audio = run_cpu(to_audio_data, audio_data.read())
+        except Exception as e:
+            return jsonify({'error': f'Could not decode audio: {e}'}), 400
         
-        # Save uploaded audio to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-            audio_data.save(temp_audio.name)
-            
-            # Recognize speech
-            with sr.AudioFile(temp_audio.name) as source:
-                audio = recognizer.record(source)
-                try:
-                    text = recognizer.recognize_google(audio)
-                except sr.UnknownValueError:
-                    return jsonify({'error': 'Could not understand audio'}), 400
-                except sr.RequestError as e:
-                    return jsonify({'error': f'Speech recognition error: {e}'}), 500
-        
-        # Clean up temp file
-        os.unlink(temp_audio.name)
+        try:
+            text = recognize(audio)
+        except sr.UnknownValueError:
+            return jsonify({'error': 'Could not understand audio'}), 400
+        except sr.RequestError as e:
+            return jsonify({'error': f'Speech recognition error: {e}'}), 500
         
         # Process the query using existing logic
         response_text, should_end = process_query(driver_id, text, session_id)
         
-        # Generate audio response
-        audio_stream = elevenlabs.text_to_speech.stream(
-            text=response_text,
-            voice_id="cgSgspJ2msm6clMCkdW9",
-            model_id="eleven_multilingual_v2"
-        )
-        
-        # Convert stream to bytes
-        audio_bytes = b''.join(audio_stream)
-        
-        return jsonify({
-            'text_input': text,
-            'text_response': response_text,
-            'audio_response': audio_bytes.hex(),  # Convert to hex for JSON transport
-            'should_end': should_end
-        })
+        return chat_reply(response_text, should_end, text_input=text)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/text-chat', methods=['POST'])
+@admitted
 def text_chat():
     try:
         data = request.json
@@ -90,118 +160,155 @@ def text_chat():
         # Process the query
         response_text, should_end = process_query(driver_id, query, session_id)
         
-        # Generate audio response
-        audio_stream = elevenlabs.text_to_speech.stream(
-            text=response_text,
-            voice_id="cgSgspJ2msm6clMCkdW9",
-            model_id="eleven_multilingual_v2"
-        )
-        
-        audio_bytes = b''.join(audio_stream)
+        return chat_reply(response_text, should_end)
         
-        return jsonify({
-            'text_response': response_text,
-            'audio_response': audio_bytes.hex(),
-            'should_end': should_end
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        'intent_batcher': intent_batcher.stats(),
+        'intent_cache': classifier.cache_stats(),
+        'keyword_router': keyword_router.stats(),
+        'pipeline': pipeline_stats.stats(),
+        'worker': {'pid': os.getpid(), 'index': os.getenv('WORKER_INDEX')},
+        'admission': admission.stats(),
+        'sessions': memory.store.stats(),
+        'tts_cache': tts_cache.stats()
+    })
+
+def emit_reply(tokens, should_end, chunked_audio=False):
+    """
+    Speak a reply to the current Socket.IO client while it is generated.
+    
+    chunked_audio=True sends raw MP3 bytes as they arrive from TTS in
+    sequence-numbered 'ai_audio_chunk' frames, closed by a frame with
+    final=True; a WAV engine's sentences are joined into one WAV stream
+    with a single header. Otherwise each sentence is sent as one base64
+    MP3 inside 'ai_response'. Text always goes out on 'ai_response',
+    followed by an isFinal marker carrying shouldEnd.
+    """
+    stream_id = uuid.uuid4().hex
+    synthesize = tts.stream if chunked_audio else synthesize_sentence
+    if chunked_audio and tts.content_type == 'audio/wav':
+        pieces = []
+
+        def synthesize(text):
+            pieces.append(text)
+            return wav_stream_piece(tts.stream(text), first=len(pieces) == 1)
+    piece = 0
+    seq = -1
+    
+    for seq, text, audio_bytes in stream_speech(tokens, synthesize):
+        if chunked_audio:
+            if text:
+                print(f"Response [{piece}]: {text}")
+                emit('ai_response', {
+                    'text': text,
+                    'audio': None,
+                    'seq': piece,
+                    'streamId': stream_id,
+                    'isFinal': False,
+                    'shouldEnd': False
+                })
+                piece += 1
+            emit('ai_audio_chunk', {
+                'streamId': stream_id,
+                'seq': seq,
+                'data': audio_bytes,
+                'mimeType': tts.content_type,
+                'final': False
+            })
+        else:
+            print(f"Response [{piece}]: {text}")
+            audio_base64 = base64.b64encode(audio_bytes).decode()
+            emit('ai_response', {
+                'text': text,
+                'audio': f'data:{tts.content_type};base64,{audio_base64}',
+                'seq': piece,
+                'streamId': stream_id,
+                'isFinal': False,
+                'shouldEnd': False
+            })
+            piece += 1
+    
+    if chunked_audio:
+        emit('ai_audio_chunk', {
+            'streamId': stream_id,
+            'seq': seq + 1,
+            'data': None,
+            'final': True
         })
+    
+    # End marker for this turn
+    emit('ai_response', {
+        'text': '',
+        'audio': None,
+        'seq': piece,
+        'streamId': stream_id,
+        'isFinal': True,
+        'shouldEnd': should_end
+    })
+
+def run_voice_turn(user_id, audio_data, chunked_audio):
+    """Recognize one recorded utterance and speak the reply."""
+    # Decode WebM/WAV in memory and recognize it
+    try:
+        audio_sr = run_cpu(to_audio_data, audio_data)
+        text = recognize(audio_sr)
+        
+        print(f"Recognized: {text}")
+        
+        # Send transcription
+        emit('transcription', {'text': text})
         
+        # Stream the reply: each sentence is spoken as soon as the
+        # LLM has produced it, while the rest is still generating
+        tokens, should_end = process_query_stream(user_id, text, user_id)
+        emit_reply(tokens, should_end, chunked_audio)
+            
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        print(f"Audio conversion error: {e}")
+        # Fallback: try direct processing
+        try:
+            pcm, rate = run_cpu(prepare_pcm, audio_data, 48000)
+            text = recognize(sr.AudioData(pcm, rate, 2))
+            emit('transcription', {'text': text})
+        except:
+            print("No speech detected")
 
 # WebSocket handlers for real-time audio
 @socketio.on('audio_stream')
 def handle_audio_stream(data):
     try:
         user_id = data['userId']
+        chunked_audio = data.get('streamAudio', False)
         
         # Check if this is a welcome message request
         if data.get('isWelcome', False):
             # Generate welcome message
-            response = f"Namaste {user_id}! Main SachAI hoon. Aapki kaise madad kar sakta hoon today?"
+            response = f"Namaste {user_id}! " + " ".join(WELCOME_SENTENCES)
             
             # Generate TTS for welcome
-            audio_stream = elevenlabs.text_to_speech.stream(
-                text=response,
-                voice_id="cgSgspJ2msm6clMCkdW9",
-                model_id="eleven_multilingual_v2"
-            )
-            
-            audio_bytes = b''.join(audio_stream)
-            audio_base64 = base64.b64encode(audio_bytes).decode()
-            
-            emit('ai_response', {
-                'text': response,
-                'audio': f'data:audio/mpeg;base64,{audio_base64}',
-                'shouldEnd': False
-            })
+            emit_reply(iter([response]), False, chunked_audio)
             return
         
         # Decode base64 audio
         audio_data = base64.b64decode(data['data'].split(',')[1])
         
-        # Create a proper WAV file
-        with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_webm:
-            temp_webm.write(audio_data)
-            temp_webm_path = temp_webm.name
-        
-        # Convert WebM to WAV using pydub
-        try:
-            from pydub import AudioSegment
-            audio = AudioSegment.from_file(temp_webm_path)
-            wav_path = temp_webm_path.replace('.webm', '.wav')
-            audio.export(wav_path, format='wav')
-            
-            # Speech recognition
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(wav_path) as source:
-                audio_sr = recognizer.record(source)
-                text = recognizer.recognize_google(audio_sr)
-                
-                print(f"Recognized: {text}")
-                
-                # Send transcription
-                emit('transcription', {'text': text})
-                
-                # Process with existing logic
-                response, should_end = process_query(user_id, text, user_id)
-                print(f"Response: {response}")
-                
-                # Generate TTS
-                audio_stream = elevenlabs.text_to_speech.stream(
-                    text=response,
-                    voice_id="cgSgspJ2msm6clMCkdW9",
-                    model_id="eleven_multilingual_v2"
-                )
-                
-                # Convert to base64
-                audio_bytes = b''.join(audio_stream)
-                audio_base64 = base64.b64encode(audio_bytes).decode()
-                
-                # Send response
-                emit('ai_response', {
-                    'text': response,
-                    'audio': f'data:audio/mpeg;base64,{audio_base64}',
-                    'shouldEnd': should_end
-                })
-                
-            os.unlink(wav_path)
-                
-        except Exception as e:
-            print(f"Audio conversion error: {e}")
-            # Fallback: try direct processing
-            try:
-                recognizer = sr.Recognizer()
-                audio_sr = sr.AudioData(audio_data, 48000, 2)
-                text = recognizer.recognize_google(audio_sr)
-                emit('transcription', {'text': text})
-            except:
-                print("No speech detected")
-        finally:
-            os.unlink(temp_webm_path)
+        # Shed load instead of queueing every session behind a full server
+        with admission.slot() as admitted:
+            if not admitted:
+                emit('error', {'message': 'Server busy, please try again'})
+                return
+            run_voice_turn(user_id, audio_data, chunked_audio)
             
     except Exception as e:
         print(f"Error processing audio: {e}")
         emit('error', {'message': str(e)})
 
 if __name__ == '__main__':
+    warm_up()
+    socketio.start_background_task(prewarm_tts)
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Worker pools and admission control for the voice servers.
+
+Under eventlet/gevent (gunicorn's eventlet worker, or SOCKETIO_ASYNC_MODE)
+network I/O yields to other sessions on its own, but CPU-bound code
+(embeddings, audio decode, local ASR) would block every session on the
+hub. run_cpu() moves such calls to a bounded pool of real OS threads.
+In the default threading mode it uses a bounded ThreadPoolExecutor so
+CPU work cannot oversubscribe the machine.
+
+Code passed to run_cpu() must not do network I/O: under monkey patching
+green sockets cannot be used from pool threads.
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 4)))
+MAX_ACTIVE_TURNS = int(os.getenv("MAX_ACTIVE_TURNS", "32"))
+MAX_QUEUED_TURNS = int(os.getenv("MAX_QUEUED_TURNS", "64"))
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", "10"))
+
+
+def async_mode():
+    """"eventlet" or "gevent" when the process is monkey patched, else "threading"."""
+    # Only look at hubs that are already loaded: monkey patching imports
+    # them first, and importing them here would cost startup time for nothing
+    patcher = sys.modules.get("eventlet.patcher")
+    if patcher is not None and patcher.is_monkey_patched("thread"):
+        return "eventlet"
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is not None and monkey.is_module_patched("threading"):
+        return "gevent"
+    return "threading"
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _thread_pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+    return _executor
+
+
+def _reset_after_fork():
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def run_cpu(fn, *args, **kwargs):
+    """Run a CPU-bound call on a real worker thread and wait for its result."""
+    mode = async_mode()
+    if mode == "eventlet":
+        from eventlet import tpool
+        tpool.set_num_threads(CPU_WORKERS)  # no-op once the pool is running
+        return tpool.execute(fn, *args, **kwargs)
+    if mode == "gevent":
+        import gevent
+        pool = gevent.get_hub().threadpool
+        if pool.maxsize != CPU_WORKERS:
+            pool.maxsize = CPU_WORKERS
+        return pool.apply(fn, args, kwargs)
+    if threading.current_thread().name.startswith("cpu"):
+        # Already on a pool thread: nesting would deadlock a full pool
+        return fn(*args, **kwargs)
+    return _thread_pool().submit(fn, *args, **kwargs).result()
+
+
+class AdmissionControl:
+    """
+    Caps concurrent voice turns. Up to max_active run at once and up to
+    max_queued wait (for at most timeout seconds); anything beyond that is
+    rejected right away so an overloaded server sheds load instead of
+    letting every session's latency grow.
+    """
+
+    def __init__(self, max_active=MAX_ACTIVE_TURNS, max_queued=MAX_QUEUED_TURNS, timeout=ADMISSION_TIMEOUT):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_active)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+
+    def acquire(self):
+        """Take a turn slot; False if the turn must be refused."""
+        with self._lock:
+            if self.waiting >= self.max_queued and self.active >= self.max_active:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+
+        start = time.perf_counter()
+        admitted = self._slots.acquire(timeout=self.timeout)
+        with self._lock:
+            self.waiting -= 1
+            if admitted:
+                self.active += 1
+                self.admitted += 1
+                self.total_wait += time.perf_counter() - start
+            else:
+                self.rejected += 1
+        return admitted
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        """Yields True if the turn was admitted, False if it must be refused."""
+        admitted = self.acquire()
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": async_mode(),
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait_ms": self.total_wait / self.admitted * 1000 if self.admitted else 0.0,
+                "max_active": self.max_active,
+                "max_queued": self.max_queued
+            }
+
+
+# Shared by every handler in this process
+admission = AdmissionControl()
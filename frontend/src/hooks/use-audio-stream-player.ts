@@ -0,0 +1,151 @@
+import * as React from "react"
+
+// One `ai_audio_chunk` frame from the voice server
+export interface AudioChunkFrame {
+  streamId: string
+  seq: number
+  data: ArrayBuffer | null
+  mimeType?: string
+  final: boolean
+}
+
+interface StreamState {
+  id: string
+  nextSeq: number
+  finalSeq: number | null
+  pending: Map<number, ArrayBuffer>
+  ready: ArrayBuffer[]
+  mediaSource: MediaSource | null
+  sourceBuffer: SourceBuffer | null
+  objectUrl: string
+  mimeType: string
+  useMse: boolean
+}
+
+const DEFAULT_MIME_TYPE = "audio/mpeg"
+
+/**
+ * Plays streamed TTS audio (MP3 by default) as sequence-numbered chunks arrive.
+ * Uses Media Source Extensions when available, otherwise buffers the
+ * stream and plays it once the end marker arrives.
+ */
+export function useAudioStreamPlayer(
+  audioRef: React.RefObject<HTMLAudioElement | null>,
+  onIdle?: () => void
+) {
+  const streamRef = React.useRef<StreamState | null>(null)
+  const onIdleRef = React.useRef(onIdle)
+  onIdleRef.current = onIdle
+
+  const supportsMse = (mimeType: string) =>
+    typeof window !== "undefined" &&
+    "MediaSource" in window &&
+    MediaSource.isTypeSupported(mimeType)
+
+  const reset = React.useCallback(() => {
+    const state = streamRef.current
+    streamRef.current = null
+    if (state) {
+      URL.revokeObjectURL(state.objectUrl)
+    }
+    if (audioRef.current) {
+      audioRef.current.pause()
+      audioRef.current.removeAttribute("src")
+    }
+  }, [audioRef])
+
+  const finish = (state: StreamState) => {
+    if (state.mediaSource && state.mediaSource.readyState === "open") {
+      state.mediaSource.endOfStream()
+    } else if (!state.useMse && audioRef.current) {
+      // Fallback: play the whole stream in one go
+      URL.revokeObjectURL(state.objectUrl)
+      state.objectUrl = URL.createObjectURL(new Blob(state.ready, { type: state.mimeType }))
+      audioRef.current.src = state.objectUrl
+      audioRef.current.play().catch(() => onIdleRef.current?.())
+    }
+  }
+
+  const drain = (state: StreamState) => {
+    const buffer = state.sourceBuffer
+    if (state.useMse) {
+      if (!buffer || buffer.updating) return
+      const next = state.ready.shift()
+      if (next) {
+        buffer.appendBuffer(next)
+        return
+      }
+    }
+    if (state.finalSeq !== null && state.nextSeq >= state.finalSeq) {
+      finish(state)
+    }
+  }
+
+  const startStream = (id: string, mimeType: string): StreamState => {
+    reset()
+    const audio = audioRef.current
+    const state: StreamState = {
+      id,
+      nextSeq: 0,
+      finalSeq: null,
+      pending: new Map(),
+      ready: [],
+      mediaSource: null,
+      sourceBuffer: null,
+      objectUrl: "",
+      mimeType,
+      useMse: !!audio && supportsMse(mimeType),
+    }
+    streamRef.current = state
+
+    if (audio) {
+      audio.onended = () => onIdleRef.current?.()
+    }
+
+    if (state.useMse && audio) {
+      const mediaSource = new MediaSource()
+      state.mediaSource = mediaSource
+      state.objectUrl = URL.createObjectURL(mediaSource)
+      mediaSource.addEventListener("sourceopen", () => {
+        if (streamRef.current !== state) return
+        const sourceBuffer = mediaSource.addSourceBuffer(mimeType)
+        sourceBuffer.mode = "sequence"
+        sourceBuffer.addEventListener("updateend", () => drain(state))
+        state.sourceBuffer = sourceBuffer
+        drain(state)
+      })
+      audio.src = state.objectUrl
+      audio.play().catch(() => onIdleRef.current?.())
+    }
+    return state
+  }
+
+  const pushChunk = React.useCallback(
+    (frame: AudioChunkFrame) => {
+      let state = streamRef.current
+      if (!state || state.id !== frame.streamId) {
+        state = startStream(frame.streamId, frame.mimeType || DEFAULT_MIME_TYPE)
+      }
+
+      if (frame.final) {
+        state.finalSeq = frame.seq
+      } else if (frame.data) {
+        state.pending.set(frame.seq, frame.data)
+      }
+
+      // Release chunks in sequence order
+      while (state.pending.has(state.nextSeq)) {
+        state.ready.push(state.pending.get(state.nextSeq)!)
+        state.pending.delete(state.nextSeq)
+        state.nextSeq += 1
+      }
+      drain(state)
+    },
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+    [audioRef]
+  )
+
+  React.useEffect(() => reset, [reset])
+
+  return { pushChunk, reset }
+}
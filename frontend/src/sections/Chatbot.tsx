@@ -12,12 +12,23 @@ import {
   Mic,
   MicOff
 } from 'lucide-react'
+import { useAudioStreamPlayer } from '@/hooks/use-audio-stream-player'
 
 interface ChatbotProps {
   userName: string
   userId: string
 }
 
+interface ChatReply {
+  text_input?: string
+  text_response: string
+  should_end: boolean
+  audio_response?: string
+}
+
+// Ask for the reply audio as a streamed binary body; JSON is the fallback
+const CHAT_ACCEPT = 'audio/*, application/json;q=0.5'
+
 interface Message {
   id: string
   type: 'bot' | 'user'
@@ -98,6 +109,7 @@ export function Chatbot({ userName, userId }: ChatbotProps) {
   const [mediaRecorder, setMediaRecorder] = useState<MediaRecorder | null>(null)
   const messagesEndRef = useRef<HTMLDivElement>(null)
   const audioRef = useRef<HTMLAudioElement>(null)
+  const audioStreamPlayer = useAudioStreamPlayer(audioRef)
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
@@ -127,6 +139,7 @@ export function Chatbot({ userName, userId }: ChatbotProps) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Accept': CHAT_ACCEPT,
         },
         body: JSON.stringify({
           query: query,
@@ -135,11 +148,7 @@ export function Chatbot({ userName, userId }: ChatbotProps) {
         })
       })
 
-      const data = await response.json()
-      
-      if (data.error) {
-        throw new Error(data.error)
-      }
+      const data = await readChatReply(response)
 
       const botResponse: Message = {
         id: Date.now().toString(),
@@ -151,9 +160,7 @@ export function Chatbot({ userName, userId }: ChatbotProps) {
       setMessages(prev => [...prev, botResponse])
       
       // Play audio response
-      if (data.audio_response) {
-        playAudioFromHex(data.audio_response)
-      }
+      playReplyAudio(response, data)
       
     } catch (error) {
       console.error('Error:', error)
@@ -169,6 +176,55 @@ export function Chatbot({ userName, userId }: ChatbotProps) {
     }
   }
 
+  // Binary replies carry the text in headers and the audio as the body
+  const readChatReply = async (response: Response): Promise<ChatReply> => {
+    const contentType = response.headers.get('Content-Type') || ''
+    if (!contentType.startsWith('audio/')) {
+      const data = await response.json()
+      if (data.error) {
+        throw new Error(data.error)
+      }
+      return data
+    }
+    const header = (name: string) => {
+      const value = response.headers.get(name)
+      return value === null ? undefined : decodeURIComponent(value)
+    }
+    return {
+      text_input: header('X-Text-Input'),
+      text_response: header('X-Text-Response') || '',
+      should_end: response.headers.get('X-Should-End') === 'true'
+    }
+  }
+
+  const playReplyAudio = (response: Response, data: ChatReply) => {
+    if (data.audio_response) {
+      playAudioFromHex(data.audio_response)
+    } else if (response.body) {
+      playAudioStream(response).catch(error => console.error('Error playing audio:', error))
+    }
+  }
+
+  // Feed the audio body to the player chunk by chunk as it downloads
+  const playAudioStream = async (response: Response) => {
+    const mimeType = response.headers.get('Content-Type') || 'audio/mpeg'
+    const streamId = `${Date.now()}`
+    const reader = response.body!.getReader()
+    let seq = 0
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      audioStreamPlayer.pushChunk({
+        streamId,
+        seq: seq++,
+        data: value.buffer.slice(value.byteOffset, value.byteOffset + value.byteLength) as ArrayBuffer,
+        mimeType,
+        final: false
+      })
+    }
+    audioStreamPlayer.pushChunk({ streamId, seq, data: null, mimeType, final: true })
+  }
+
   const playAudioFromHex = (hexString: string) => {
     try {
       const bytes = new Uint8Array(hexString.match(/.{1,2}/g)!.map(byte => parseInt(byte, 16)))
@@ -228,14 +284,13 @@ export function Chatbot({ userName, userId }: ChatbotProps) {
 
       const response = await fetch(`${BACKEND_URL}/voice-chat`, {
         method: 'POST',
+        headers: {
+          'Accept': CHAT_ACCEPT,
+        },
         body: formData
       })
 
-      const data = await response.json()
-      
-      if (data.error) {
-        throw new Error(data.error)
-      }
+      const data = await readChatReply(response)
 
       // Add user message (transcribed text)
       const userMessage: Message = {
@@ -256,9 +311,7 @@ export function Chatbot({ userName, userId }: ChatbotProps) {
       setMessages(prev => [...prev, botResponse])
       
       // Play audio response
-      if (data.audio_response) {
-        playAudioFromHex(data.audio_response)
-      }
+      playReplyAudio(response, data)
       
     } catch (error) {
       console.error('Error:', error)
@@ -12,6 +12,7 @@ import {
   Bot,
   Sparkles
 } from 'lucide-react'
+import { useAudioStreamPlayer, type AudioChunkFrame } from '@/hooks/use-audio-stream-player'
 
 interface WebCallProps {
   userName: string
@@ -34,6 +35,14 @@ export function WebCall({ userId }: WebCallProps) {
   
   const audioRef = useRef<HTMLAudioElement>(null)
   const intervalRef = useRef<number | null>(null)
+  const audioQueueRef = useRef<string[]>([])
+  const isPlayingRef = useRef(false)
+  
+  // Raw MP3 chunks from the server are played as they arrive
+  const audioStreamPlayer = useAudioStreamPlayer(audioRef, () => {
+    isPlayingRef.current = false
+    setIsAiSpeaking(false)
+  })
 
   // Start call with SocketIO streaming
   const handleStartCall = async () => {
@@ -54,8 +63,8 @@ export function WebCall({ userId }: WebCallProps) {
       // Get microphone access
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true })
       
-      // Connect to SocketIO
-      const socket = (window as any).io(`${BACKEND_URL}`)
+      // Connect to SocketIO; driver_id keeps the session on one server worker
+      const socket = (window as any).io(`${BACKEND_URL}`, { query: { driver_id: userId } })
       
       socket.on('connect', () => {
         console.log('✅ Connected to voice stream')
@@ -68,7 +77,8 @@ export function WebCall({ userId }: WebCallProps) {
           socket.emit('audio_stream', {
             data: 'data:audio/wav;base64,', // Empty audio to trigger welcome
             userId: userId,
-            isWelcome: true
+            isWelcome: true,
+            streamAudio: true
           })
         }, 1000)
       })
@@ -78,13 +88,22 @@ export function WebCall({ userId }: WebCallProps) {
       })
       
       socket.on('ai_response', (data: any) => {
-        setConversation(prev => [...prev, { type: 'ai', text: data.text }])
+        // Streamed replies arrive sentence by sentence; seq > 0 continues the last AI message
+        if (data.text) {
+          setConversation(prev => {
+            const last = prev[prev.length - 1]
+            if (data.seq > 0 && last && last.type === 'ai') {
+              return [...prev.slice(0, -1), { ...last, text: `${last.text} ${data.text}` }]
+            }
+            return [...prev, { type: 'ai', text: data.text }]
+          })
+        }
         setIsAiSpeaking(true)
         setIsProcessing(false)
         
         if (data.audio && !isSpeakerOff) {
           playAudioFromBase64(data.audio)
-        } else {
+        } else if (data.isFinal !== false && !isPlayingRef.current) {
           setTimeout(() => setIsAiSpeaking(false), 2000)
         }
         
@@ -94,6 +113,13 @@ export function WebCall({ userId }: WebCallProps) {
         }
       })
       
+      socket.on('ai_audio_chunk', (frame: AudioChunkFrame) => {
+        if (isSpeakerOff) return
+        isPlayingRef.current = true
+        setIsAiSpeaking(true)
+        audioStreamPlayer.pushChunk(frame)
+      })
+      
       socket.on('connect_error', (error: any) => {
         console.error('Socket connection failed:', error)
         setIsInCall(false)
@@ -141,6 +167,9 @@ export function WebCall({ userId }: WebCallProps) {
       setRoom(null)
     }
     
+    audioQueueRef.current = []
+    isPlayingRef.current = false
+    audioStreamPlayer.reset()
     if (audioRef.current) {
       audioRef.current.pause()
       audioRef.current.src = ''
@@ -175,7 +204,8 @@ export function WebCall({ userId }: WebCallProps) {
         reader.onload = () => {
           socket.emit('audio_stream', {
             data: reader.result,
-            userId: userId
+            userId: userId,
+            streamAudio: true
           })
         }
         reader.readAsDataURL(audioBlob)
@@ -208,14 +238,25 @@ export function WebCall({ userId }: WebCallProps) {
     // setMediaRecorder(mediaRecorder) - removed unused
   }
   
+  // Queue audio so streamed sentences play back to back
   const playAudioFromBase64 = (base64Audio: string) => {
-    if (audioRef.current) {
-      audioRef.current.src = base64Audio
-      audioRef.current.onended = () => {
-        setIsAiSpeaking(false)
-      }
-      audioRef.current.play()
+    audioQueueRef.current.push(base64Audio)
+    if (!isPlayingRef.current) {
+      playNextAudio()
+    }
+  }
+
+  const playNextAudio = () => {
+    const next = audioQueueRef.current.shift()
+    if (!next || !audioRef.current) {
+      isPlayingRef.current = false
+      setIsAiSpeaking(false)
+      return
     }
+    isPlayingRef.current = true
+    audioRef.current.src = next
+    audioRef.current.onended = playNextAudio
+    audioRef.current.play().catch(() => playNextAudio())
   }
 
   // Start continuous voice listening (like backend)